@@ -0,0 +1,207 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+##Uniform samples used to bracket roots and extrema before refining them
+BRACKET_SAMPLES = 2001
+##Iterations of the vectorized golden-section search that refines extrema
+GOLDEN_ITERATIONS = 60
+GOLDEN_RATIO = (np.sqrt(5) - 1) / 2
+##Levels of interval bisection before the intervals still open are accepted as they are
+MAX_INTEGRATION_LEVELS = 50
+##Error, relative to the integral (absolute below 1), that those last intervals may leave before it is reported as diverging
+MAX_OPEN_ERROR = 1e-6
+
+##Gauss-Kronrod 7-15 rule on [-1, 1]: the 15 Kronrod nodes, their weights and the
+##weights of the embedded 7-point Gauss rule (zero on the Kronrod-only nodes)
+_KRONROD_HALF = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0,
+])
+_KRONROD_HALF_WEIGHTS = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+])
+_GAUSS_HALF_WEIGHTS = np.array([
+    0.0, 0.129484966168869693270611432679082, 0.0, 0.279705391489276667901467771423780,
+    0.0, 0.381830050505118944950369775488975, 0.0, 0.417959183673469387755102040816327,
+])
+KRONROD_NODES = np.concatenate([-_KRONROD_HALF[:-1], _KRONROD_HALF[::-1]])
+KRONROD_WEIGHTS = np.concatenate([_KRONROD_HALF_WEIGHTS[:-1], _KRONROD_HALF_WEIGHTS[::-1]])
+GAUSS_WEIGHTS = np.concatenate([_GAUSS_HALF_WEIGHTS[:-1], _GAUSS_HALF_WEIGHTS[::-1]])
+
+def brent_root(func, a, b, fa, fb, xtol=2e-12, rtol=8.9e-16, maxiter=100):
+    """Finds a root of a scalar function in [a, b], where fa and fb have opposite signs.
+
+    Brent's method: inverse quadratic or secant steps while they make
+    progress, bisection otherwise, so it converges at least as fast as
+    bisection.
+    """
+    x_pre, x_cur, f_pre, f_cur = a, b, fa, fb
+    x_blk = f_blk = s_pre = s_cur = 0.0
+    for _ in range(maxiter):
+        if f_pre * f_cur < 0:
+            x_blk, f_blk = x_pre, f_pre
+            s_pre = s_cur = x_cur - x_pre
+        if abs(f_blk) < abs(f_cur):
+            x_pre, x_cur, x_blk = x_cur, x_blk, x_cur
+            f_pre, f_cur, f_blk = f_cur, f_blk, f_cur
+        delta = (xtol + rtol * abs(x_cur)) / 2
+        s_bis = (x_blk - x_cur) / 2
+        if f_cur == 0 or abs(s_bis) < delta:
+            return x_cur
+        if abs(s_pre) > delta and abs(f_cur) < abs(f_pre):
+            if x_pre == x_blk:
+                s_try = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+            else:
+                d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+                d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+                s_try = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+            if 2 * abs(s_try) < min(abs(s_pre), 3 * abs(s_bis) - delta):
+                s_pre, s_cur = s_cur, s_try
+            else:
+                s_pre = s_cur = s_bis
+        else:
+            s_pre = s_cur = s_bis
+        x_pre, f_pre = x_cur, f_cur
+        x_cur += s_cur if abs(s_cur) > delta else (delta if s_bis > 0 else -delta)
+        f_cur = func(x_cur)
+    return x_cur
+
+def find_roots(func, x_min, x_max, samples=BRACKET_SAMPLES):
+    """Returns the sorted roots of func on [x_min, x_max] as a float64 array.
+
+    func takes and returns a float64 array. Sign changes between neighbouring
+    finite samples are located in one vectorized pass and each is refined
+    with Brent's method. A sign change across a pole (where |f| grows
+    instead of vanishing) is not reported as a root.
+    """
+    scalar = lambda x: float(func(np.array([x]))[0])
+    x = np.linspace(x_min, x_max, samples)
+    y = func(x)
+    exact = x[y == 0]
+    with np.errstate(invalid="ignore"):
+        brackets = np.flatnonzero(np.sign(y[:-1]) * np.sign(y[1:]) < 0)
+    roots = list(exact)
+    for i in brackets:
+        root = brent_root(scalar, x[i], x[i + 1], y[i], y[i + 1])
+        if abs(scalar(root)) <= min(abs(y[i]), abs(y[i + 1])):
+            roots.append(root)
+    return np.sort(np.array(roots, dtype=np.float64))
+
+def _golden_section(func, low, high, sign):
+    """Refines all brackets [low, high] at once towards a minimum of sign * func."""
+    c = high - GOLDEN_RATIO * (high - low)
+    d = low + GOLDEN_RATIO * (high - low)
+    fc, fd = sign * func(c), sign * func(d)
+    for _ in range(GOLDEN_ITERATIONS):
+        left = fc < fd
+        high = np.where(left, d, high)
+        low = np.where(left, low, c)
+        ## The surviving interior point is reused; one new point per bracket is evaluated
+        kept_x, kept_f = np.where(left, c, d), np.where(left, fc, fd)
+        new_c = high - GOLDEN_RATIO * (high - low)
+        new_d = low + GOLDEN_RATIO * (high - low)
+        new_f = sign * func(np.where(left, new_c, new_d))
+        c, d = np.where(left, new_c, kept_x), np.where(left, kept_x, new_d)
+        fc, fd = np.where(left, new_f, kept_f), np.where(left, kept_f, new_f)
+    return (low + high) / 2
+
+def find_extrema(func, x_min, x_max, samples=BRACKET_SAMPLES):
+    """Returns (minima, maxima): the x positions of the interior local extrema of func.
+
+    Slope sign changes in the sampled array bracket the candidates, which
+    are refined together by a vectorized golden-section search. Candidates
+    whose refined value jumps far beyond the sampled neighbours are poles and
+    are dropped.
+    """
+    x = np.linspace(x_min, x_max, samples)
+    y = func(x)
+    slope = np.diff(y)
+    finite = np.isfinite(y[:-2]) & np.isfinite(y[1:-1]) & np.isfinite(y[2:])
+    result = []
+    for sign, turning in ((1, (slope[:-1] < 0) & (slope[1:] >= 0)), (-1, (slope[:-1] > 0) & (slope[1:] <= 0))):
+        index = np.flatnonzero(turning & finite) + 1
+        if not index.size:
+            result.append(np.empty(0))
+            continue
+        x_best = _golden_section(func, x[index - 1], x[index + 1], sign)
+        y_best = func(x_best)
+        rise = np.abs(y[index] - y[index - 1]) + np.abs(y[index + 1] - y[index])
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(y_best) & (np.abs(y_best - y[index]) <= 10 * rise + 1e-300)
+        result.append(x_best[valid])
+    return result[0], result[1]
+
+def integrate(func, a, b, tol=1e-10):
+    """Returns (integral, error estimate) of func over [a, b].
+
+    Adaptive Gauss-Kronrod 7-15: every interval still active is evaluated in
+    the same vectorized call; intervals whose Kronrod and Gauss estimates
+    agree within their share of the tolerance are accepted and the rest are
+    halved. Intervals still open after MAX_INTEGRATION_LEVELS halvings hold a
+    jump, such as in x//1, or a singularity; their error shrinks with their
+    width at a jump or an integrable singularity, so their estimate is added
+    and the error estimate grows accordingly. Raises ValueError if func is
+    undefined somewhere on [a, b] or that error is still above MAX_OPEN_ERROR,
+    as it is for a divergent integral.
+    """
+    if a == b:
+        return 0.0, 0.0
+    low, high = np.array([float(min(a, b))]), np.array([float(max(a, b))])
+    total = error = 0.0
+    width = high[0] - low[0]
+    for _ in range(MAX_INTEGRATION_LEVELS):
+        center, half = (low + high) / 2, (high - low) / 2
+        y = func(center[:, np.newaxis] + half[:, np.newaxis] * KRONROD_NODES)
+        if not np.isfinite(y).all():
+            raise ValueError("Function is undefined on the interval")
+        kronrod = half * (y @ KRONROD_WEIGHTS)
+        interval_error = np.abs(kronrod - half * (y @ GAUSS_WEIGHTS))
+        estimate = total + kronrod.sum()
+        allowed = max(tol, tol * abs(estimate)) * (high - low) / width
+        done = interval_error <= allowed
+        total += kronrod[done].sum()
+        error += interval_error[done].sum()
+        if done.all():
+            return (total if b > a else -total), error
+        low, high, center = low[~done], high[~done], center[~done]
+        low, high = np.concatenate([low, center]), np.concatenate([center, high])
+    total += kronrod[~done].sum()
+    error += interval_error[~done].sum()
+    if not error <= MAX_OPEN_ERROR * max(1.0, abs(total)):
+        raise ValueError("Integral does not converge")
+    return (total if b > a else -total), error
+
+class AnalysisCache:
+    """Bounded LRU cache of analysis results keyed by (method, expression, interval)."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """Returns the cached result for key, calling compute() on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Empties the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1 @@
+from benchmarks.suite import compare, run_suite
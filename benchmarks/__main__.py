@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+from benchmarks.suite import REPEAT, SEED, THRESHOLD, WARMUP, compare, run_suite
+
+def format_time(seconds):
+    """Formats seconds with a unit that keeps three significant digits readable."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+def print_result(name, result):
+    ## Throughput in operations per second; for per-sample benchmarks such as sweeps, samples per second
+    rate = 1 / result["median"] if result["median"] > 0 else float("inf")
+    print(f"{name:<40} median {format_time(result['median']):>10}   p95 {format_time(result['p95']):>10}   {rate:>14,.0f}/s", file=sys.stderr)
+
+def main(argv=None):
+    """Command-line entry point: python -m benchmarks run|compare."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Headless benchmarks for the calculator engine and plotting path.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite and write JSON results")
+    run_parser.add_argument("--output", "-o", help="results file (default: stdout)")
+    run_parser.add_argument("--seed", type=int, default=SEED)
+    run_parser.add_argument("--warmup", type=int, default=WARMUP, help="untimed calls before measuring")
+    run_parser.add_argument("--repeat", type=int, default=REPEAT, help="timed samples per benchmark")
+    run_parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    compare_parser = commands.add_parser("compare", help="compare two results files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD, help="relative median slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.seed, args.warmup, args.repeat, args.only, progress=print_result)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            json.dump(results, sys.stdout, indent=2)
+            print()
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for name, before, after, ratio, status in rows:
+        print(f"{name:<40} {format_time(before):>10} {format_time(after):>10} {ratio:>6.2f}x  {status}")
+    regressions = sum(status == "regression" for *_, status in rows)
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import math
+import time
+from calculator import CalculatorLogic
+
+def time_call(func, repeat=3):
+    """Returns the best wall-clock time of several calls to func."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark_graph_function(func_str="sin(x) * exp(-x / 10) + sqrt(x * x + 1)", sizes=(1000, 10000, 100000)):
+    """Compares the per-point and vectorized graph_function paths."""
+    logic = CalculatorLogic()
+    results = []
+    for n in sizes:
+        per_point = time_call(lambda: logic.graph_function(func_str, -10, 10, n, vectorized=False))
+        vectorized = time_call(lambda: logic.graph_function(func_str, -10, 10, n, vectorized=True))
+        results.append((n, per_point, vectorized))
+    return results
+
+def benchmark_adaptive_sampling(func_strs=("sin(x)", "tan(x)", "sin(1/x)", "exp(-x * x) * cos(5 * x)"), dense_points=100000):
+    """Compares evaluation counts and time of adaptive sampling against a dense uniform grid."""
+    logic = CalculatorLogic()
+    results = []
+    for func_str in func_strs:
+        x_values, _ = logic.graph_function_adaptive(func_str, -10, 10)
+        adaptive = time_call(lambda: logic.graph_function_adaptive(func_str, -10, 10))
+        dense = time_call(lambda: logic.graph_function(func_str, -10, 10, dense_points))
+        results.append((func_str, len(x_values), adaptive, dense_points, dense))
+    return results
+
+def run_chain(logic, steps, round_trip):
+    """Runs a chain of scientific and arithmetic operations on one CalculatorLogic.
+
+    With round_trip=True the operand is reset to its display text after every
+    step, which reproduces the parse/format cycle of a string-held operand.
+    """
+    ops = ("sin", "exp", "sqrt", "cos", "atan")
+    logic.clear()
+    logic.append_digit("2")
+    for i in range(steps):
+        logic.scientific_operation(ops[i % len(ops)])
+        if round_trip:
+            logic.current = logic.current
+        logic.set_operation("+")
+        logic.append_digit("1")
+        logic.evaluate()
+        if round_trip:
+            logic.current = logic.current
+
+def benchmark_chained_operations(steps=20000):
+    """Compares chained operations on the numeric operand against a string round trip per step."""
+    logic = CalculatorLogic()
+    numeric = time_call(lambda: run_chain(logic, steps, round_trip=False))
+    string = time_call(lambda: run_chain(logic, steps, round_trip=True))
+    return steps, numeric, string
+
+def run_precision_workload(logic, steps):
+    """Runs a mix of arithmetic, constants and scientific operations."""
+    ops = ("sqrt", "ln", "exp", "sin", "atan")
+    for i in range(steps):
+        logic.insert_constant("π")
+        logic.set_operation("*")
+        logic.append_digit(str(i % 9 + 1))
+        logic.evaluate()
+        logic.set_operation("/")
+        logic.append_digit("7")
+        logic.evaluate()
+        logic.scientific_operation(ops[i % len(ops)])
+
+def benchmark_precision(digit_counts=(16, 28, 50, 100, 200, 400), steps=100):
+    """Measures the time per workload step in each precision mode as the number of digits grows."""
+    logic = CalculatorLogic()
+    logic.set_precision("float")
+    float_time = time_call(lambda: run_precision_workload(logic, steps)) / steps
+    results = []
+    for digits in digit_counts:
+        row = [digits]
+        for mode in ("decimal", "fraction"):
+            logic.set_precision(mode, digits)
+            row.append(time_call(lambda: run_precision_workload(logic, steps)) / steps)
+        results.append(tuple(row))
+    return float_time, results
+
+def dense_roots(x, y):
+    """Roots by linear interpolation between sign changes of a dense sample."""
+    import numpy as np
+    i = np.flatnonzero(np.sign(y[:-1]) * np.sign(y[1:]) < 0)
+    return x[i] - y[i] * (x[i + 1] - x[i]) / (y[i + 1] - y[i])
+
+def dense_maxima(x, y):
+    """Maxima as the densest samples where the slope turns from rising to falling."""
+    import numpy as np
+    slope = np.diff(y)
+    return x[np.flatnonzero((slope[:-1] > 0) & (slope[1:] <= 0)) + 1]
+
+def benchmark_analysis(dense_points=1000000):
+    """Compares the analysis module against brute-force dense sampling on problems with known answers.
+
+    Returns (method, analysis seconds, analysis error, dense seconds, dense error) rows.
+    """
+    import numpy as np
+    import analysis
+    logic = CalculatorLogic()
+    sin = lambda x: logic.evaluate_function_array("sin(x)", x)
+    gauss = lambda x: logic.evaluate_function_array("exp(-x * x)", x)
+    x_dense = np.linspace(-10, 10, dense_points)
+    true_roots = np.pi * np.arange(-3, 4)
+    true_maxima = np.pi / 2 + 2 * np.pi * np.arange(-1, 2)
+    true_integral = math.sqrt(math.pi) * math.erf(10)
+    x_points = np.linspace(-9, 9, 1001)
+
+    def error(found, expected):
+        return np.max(np.abs(found - expected)) if len(found) == len(expected) else float("inf")
+
+    cases = [
+        ("roots", lambda: analysis.find_roots(sin, -10, 10), lambda: dense_roots(x_dense, sin(x_dense)), lambda found: error(found, true_roots)),
+        ("maxima", lambda: analysis.find_extrema(sin, -10, 10)[1], lambda: dense_maxima(x_dense, sin(x_dense)), lambda found: error(found, true_maxima)),
+        ("integral", lambda: analysis.integrate(gauss, -10, 10)[0], lambda: np.trapezoid(gauss(x_dense), x_dense), lambda found: abs(found - true_integral)),
+        ("derivative", lambda: logic.evaluate_derivative_array("sin(x)", x_points)[1],
+         lambda: np.interp(x_points, x_dense, np.gradient(sin(x_dense), x_dense)), lambda found: error(found, np.cos(x_points))),
+    ]
+    results = []
+    for method, fast, dense, measure in cases:
+        results.append((method, time_call(fast), measure(fast()), time_call(dense), measure(dense())))
+    return results
+
+def benchmark_common_subexpressions(points=100000, func_strs=(
+        "sin(x) ** 2 + cos(x) ** 2 + sin(x) * cos(x) + exp(sin(x)) / (1 + cos(x) ** 2)",
+        "sqrt(x * x + 1) + 1 / sqrt(x * x + 1) + ln(sqrt(x * x + 1)) * sqrt(x * x + 1)",
+        "exp(-x * x) * sin(3 * x) + exp(-x * x) * cos(3 * x) + exp(-x * x)")):
+    """Compares evaluation with and without the simplified, CSE-compiled graph, and f with f' in one pass.
+
+    Returns (expression, plain seconds, CSE seconds, f then f' seconds, f + f' one pass seconds) rows.
+    """
+    import numpy as np
+    from expressions import array_functions, compile_expression
+    x_values = np.linspace(-5, 5, points)
+    namespace = dict(array_functions(), pi=np.pi, e=np.e, __builtins__=None)
+    results = []
+    for func_str in func_strs:
+        plain = compile(func_str, "<function>", "eval")
+        expr = compile_expression(func_str)
+        derivative = expr.derivative()
+        pair = expr.with_derivative()
+        env = {"x": x_values}
+        with np.errstate(all="ignore"):
+            plain_time = time_call(lambda: eval(plain, namespace, {"x": x_values}))
+            cse_time = time_call(lambda: expr.array(env))
+            separate_time = time_call(lambda: (expr.array(env), derivative.array(env)))
+            pair_time = time_call(lambda: pair.array(env))
+        results.append((func_str, plain_time, cse_time, separate_time, pair_time))
+    return results
+
+if __name__ == "__main__":
+    print(f"{'points':>10} {'per-point (s)':>14} {'vectorized (s)':>15} {'speedup':>9}")
+    for n, per_point, vectorized in benchmark_graph_function():
+        print(f"{n:>10} {per_point:>14.4f} {vectorized:>15.5f} {per_point / vectorized:>8.1f}x")
+    print()
+    print(f"{'function':>26} {'adaptive evals':>15} {'adaptive (s)':>13} {'dense evals':>12} {'dense (s)':>10}")
+    for func_str, evals, adaptive, dense_evals, dense in benchmark_adaptive_sampling():
+        print(f"{func_str:>26} {evals:>15} {adaptive:>13.5f} {dense_evals:>12} {dense:>10.5f}")
+    print()
+    steps, numeric, string = benchmark_chained_operations()
+    print(f"chained operations ({steps} steps): numeric {numeric:.4f} s, string round trip {string:.4f} s ({string / numeric:.2f}x)")
+
+    print()
+    float_time, rows = benchmark_precision()
+    print(f"precision workload, float: {float_time * 1e6:.1f} us/step")
+    print(f"{'digits':>8} {'decimal (us/step)':>18} {'fraction (us/step)':>19} {'decimal us/digit':>17}")
+    for digits, decimal_time, fraction_time in rows:
+        print(f"{digits:>8} {decimal_time * 1e6:>18.1f} {fraction_time * 1e6:>19.1f} {decimal_time * 1e6 / digits:>17.2f}")
+
+    print()
+    print(f"{'method':>10} {'analysis (s)':>13} {'analysis error':>15} {'dense (s)':>10} {'dense error':>12}")
+    for method, fast, fast_error, dense, dense_error in benchmark_analysis():
+        print(f"{method:>10} {fast:>13.5f} {fast_error:>15.2e} {dense:>10.5f} {dense_error:>12.2e}")
+
+    print()
+    print(f"{'expression':>40} {'plain (s)':>10} {'CSE (s)':>9} {'f then df (s)':>14} {'one-pass deriv (s)':>19}")
+    for func_str, plain, cse, separate, pair in benchmark_common_subexpressions():
+        print(f"{func_str[:40]:>40} {plain:>10.5f} {cse:>9.5f} {separate:>14.5f} {pair:>19.5f}")
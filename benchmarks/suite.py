@@ -0,0 +1,182 @@
+import math
+import platform
+import random
+import statistics
+import time
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+from calculator import CalculatorLogic
+from decimation import min_max_decimate
+import sweeps
+
+SEED = 1234
+WARMUP = 2
+REPEAT = 15
+##Default relative slowdown of the median that compare() reports as a regression
+THRESHOLD = 0.10
+
+GRAPH_SIZES = (10**3, 10**4, 10**5, 10**6)
+RENDER_SIZES = (10**3, 10**4, 10**5, 10**6)
+FACTORIAL_SIZES = (10, 100, 1000, 10**4, 10**6)
+HISTORY_SIZES = (10, 100, 1000)
+##Samples per broadcast pass compared for a sweep of SWEEP_SHAPE (parameter values, x points)
+SWEEP_PASS_SIZES = (2**16, 2**18, 2**20, 2**22)
+SWEEP_SHAPE = (20, 10**5)
+SCIENTIFIC_OPS = ("sin", "cos", "tan", "sinh", "cosh", "tanh", "asin", "acos", "atan", "log", "ln", "sqrt", "exp")
+BENCHMARK_FUNCTION = "sin(x) * exp(-x / 10) + sqrt(x * x + 1)"
+
+def measure(func, warmup=WARMUP, repeat=REPEAT, per=1):
+    """Times func after warmup calls and returns its statistics in seconds per operation.
+
+    per is the number of operations one call of func performs.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) / per)
+    ordered = sorted(samples)
+    return {
+        "median": statistics.median(ordered),
+        "p95": ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)],
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "samples": len(ordered),
+        "per": per,
+    }
+
+def bench_evaluate_function(rng, calls=1000):
+    """evaluate_function per call, over random x."""
+    logic = CalculatorLogic()
+    x_values = [rng.uniform(-10, 10) for _ in range(calls)]
+    def run():
+        for x in x_values:
+            logic.evaluate_function(BENCHMARK_FUNCTION, x)
+    return {"evaluate_function": (run, calls)}
+
+def bench_graph_function(rng):
+    """Vectorized graph_function at each size."""
+    logic = CalculatorLogic()
+    return {
+        f"graph_function[{n}]": (lambda n=n: logic.graph_function(BENCHMARK_FUNCTION, -10, 10, n), 1)
+        for n in GRAPH_SIZES
+    }
+
+def bench_scientific_mix(rng, steps=1000):
+    """A seeded random mix of scientific operations on in-domain operands, per operation."""
+    logic = CalculatorLogic()
+    mix = [(rng.choice(SCIENTIFIC_OPS), f"{rng.uniform(0.01, 0.99):.6f}") for _ in range(steps)]
+    def run():
+        for op, operand in mix:
+            logic.current = operand
+            logic.scientific_operation(op)
+    return {"scientific_operation mix": (run, steps)}
+
+def bench_factorial(rng):
+    """factorial at each n: exact, memoized and approximated ranges."""
+    logic = CalculatorLogic()
+    def run(n):
+        logic.current = str(n)
+        logic.factorial()
+    return {f"factorial[{n}]": (lambda n=n: run(n), 1) for n in FACTORIAL_SIZES}
+
+def bench_history(rng, count=10):
+    """get_history(count) as the history grows."""
+    cases = {}
+    for size in HISTORY_SIZES:
+        logic = CalculatorLogic()
+        for _ in range(size):
+            logic.history.add(rng.random(), "+", rng.random(), rng.random())
+        cases[f"get_history[{size}]"] = (lambda logic=logic: logic.get_history(count), 1)
+    return cases
+
+def render_plot(logic, canvas, ax, func_strs, num_points):
+    """Evaluates and fully renders the plot the way GraphingFrame.plot_function does, without Tk."""
+    for line in list(ax.lines):
+        line.remove()
+    for func_str in func_strs:
+        x_values, y_values = logic.graph_function(func_str, -10, 10, num_points)
+        ax.plot(*min_max_decimate(x_values, y_values, int(ax.bbox.width)), label=func_str)
+    ax.legend()
+    ax.relim()
+    ax.autoscale_view()
+    canvas.draw()
+
+def bench_plot_render(rng):
+    """Evaluation plus a full Agg draw of two functions at each size."""
+    logic = CalculatorLogic()
+    figure = Figure(figsize=(5, 4))
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    func_strs = (BENCHMARK_FUNCTION, "cos(x) * x")
+    return {
+        f"plot_function render[{n}]": (lambda n=n: render_plot(logic, canvas, ax, func_strs, n), 1)
+        for n in RENDER_SIZES
+    }
+
+def bench_sweep(rng):
+    """sin(k*x) sweeps per sample: one pass over 50 curves, and a larger sweep at each pass size."""
+    logic = CalculatorLogic()
+    small = np.arange(1, 51.0), np.linspace(-10, 10, 1000)
+    values, x_values = np.arange(1, SWEEP_SHAPE[0] + 1.0), np.linspace(-10, 10, SWEEP_SHAPE[1])
+    samples = SWEEP_SHAPE[0] * SWEEP_SHAPE[1]
+    cases = {"sweep[50x1000]": (lambda: sweeps.evaluate_sweep(logic, "sin(k*x)", "k", *small), small[0].size * small[1].size)}
+    for size in SWEEP_PASS_SIZES:
+        cases[f"sweep[{SWEEP_SHAPE[0]}x{SWEEP_SHAPE[1]} pass={size}]"] = (
+            lambda size=size: sweeps.evaluate_sweep(logic, "sin(k*x)", "k", values, x_values, max_samples=size), samples
+        )
+    return cases
+
+BENCHMARKS = (bench_evaluate_function, bench_graph_function, bench_scientific_mix, bench_factorial, bench_history, bench_plot_render, bench_sweep)
+
+def run_suite(seed=SEED, warmup=WARMUP, repeat=REPEAT, only=None, progress=None):
+    """Runs every benchmark whose name contains only (all if None) and returns the results document."""
+    rng = random.Random(seed)
+    results = {}
+    for make_cases in BENCHMARKS:
+        for name, (func, per) in make_cases(rng).items():
+            if only and only not in name:
+                continue
+            results[name] = measure(func, warmup, repeat, per)
+            if progress:
+                progress(name, results[name])
+    return {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+            "warmup": warmup,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """Compares two results documents by median.
+
+    Returns (name, baseline median, current median, ratio, status) rows for
+    the benchmarks in both, where status is "regression", "improvement" or
+    "ok" by the relative threshold.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before, after = baseline["results"][name]["median"], result["median"]
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows
@@ -1,5 +1,19 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
+
+##How often to check whether exact factorial digits are ready, in milliseconds
+EXACT_POLL_MS = 100
+
+##Text each button types in formula mode; the other buttons keep their keypad action
+FORMULA_INPUT = {
+    **{digit: digit for digit in "0123456789"},
+    **{name: f"{name}(" for name in ("sin", "cos", "tan", "sinh", "cosh", "tanh", "asin", "acos", "atan", "log", "ln")},
+    "√": "√(", "e^x": "exp(", "(": "(", ")": ")",
+    "π": "π", "e": "e", "c": "c", "g": "g", ".": ".", "j": "j", "±": "-",
+    "+": " + ", "-": " - ", "*": " * ", "/": " / ", "^": "^", "mod": " mod ", "!": "!", "%": "%",
+}
+##Characters typed on the keyboard that go into the formula, besides letters and digits
+FORMULA_KEYS = set("+-*/^%!().√π")
 
 class CalculatorButtons:
     def __init__(self, parent, display, logic):
@@ -9,6 +23,8 @@ class CalculatorButtons:
         self.frame.grid(row=1, column=0, columnspan=5, sticky="nsew", padx=5, pady=5)
 
         self.create_buttons()
+        self.frame.winfo_toplevel().bind("<Key>", self.on_key, add="+")
+        self.frame.winfo_toplevel().bind("<<Paste>>", self.on_paste, add="+")
 
     def create_buttons(self):
         """Creates and lays out all calculator buttons."""
@@ -66,6 +82,10 @@ class CalculatorButtons:
             ("m→km", lambda: self.logic.convert_unit("m_to_km"), 10, 2),
             ("c", lambda: self.logic.insert_constant("c"), 10, 3),
             ("g", lambda: self.logic.insert_constant("g"), 10, 4),
+            ("(", lambda: self.logic.formula_input("("), 11, 0),
+            (")", lambda: self.logic.formula_input(")"), 11, 1),
+            ("Formula", self.logic.toggle_formula_mode, 11, 2),
+            ("exact n!", self.show_exact_factorial, 11, 3),
             ("History", self.display.update_history, 11, 4)
         ]
 
@@ -74,7 +94,7 @@ class CalculatorButtons:
             btn = ttk.Button(
                 self.frame,
                 text=text,
-                command=lambda cmd=command: self.update_display(cmd),
+                command=lambda text=text, cmd=command: self.press(text, cmd),
                 style="Calc.TButton"
             )
             btn.grid(row=row, column=col, sticky="nsew", padx=2, pady=2)
@@ -86,6 +106,52 @@ class CalculatorButtons:
         for i in range(5):
             self.frame.grid_columnconfigure(i, weight=1)
 
+    def press(self, text, command):
+        """Handles a button: in formula mode it types into the formula, otherwise it runs command."""
+        if self.logic.formula_line is None or command == self.logic.toggle_formula_mode:
+            self.update_display(command)
+        elif text in FORMULA_INPUT:
+            self.update_formula(self.logic.formula_input(FORMULA_INPUT[text]))
+        elif text == "=":
+            self.display.update(self.logic.evaluate_formula())
+            self.display.update_preview("")
+            self.display.update_history()
+        elif text in ("C", "CE"):
+            self.update_formula(self.logic.formula_clear() if text == "C" else self.logic.formula_backspace())
+        else:
+            self.update_display(command)
+
+    def on_key(self, event):
+        """Types keyboard input into the formula; Return evaluates, BackSpace deletes and Escape clears."""
+        if event.keysym in ("Return", "KP_Enter"):
+            if self.logic.formula_line is not None:
+                self.press("=", None)
+        elif event.keysym == "BackSpace":
+            if self.logic.formula_line:
+                self.update_formula(self.logic.formula_backspace())
+        elif event.keysym == "Escape":
+            if self.logic.formula_line is not None:
+                self.update_formula(self.logic.formula_clear())
+        elif event.char and (event.char.isalnum() or event.char in FORMULA_KEYS):
+            self.update_formula(self.logic.formula_input(event.char))
+
+    def on_paste(self, event):
+        """Types pasted text into the formula in one step instead of key by key."""
+        if self.logic.formula_line is None or isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return
+        try:
+            text = self.frame.clipboard_get()
+        except tk.TclError:
+            return
+        text = "".join(char for char in " ".join(text.split()) if char.isalnum() or char == " " or char in FORMULA_KEYS)
+        if text:
+            self.update_formula(self.logic.formula_input(text))
+
+    def update_formula(self, text):
+        """Shows the formula with its live result, which is only worked out when the display next flushes."""
+        self.display.update(text)
+        self.display.update_preview(self.logic.formula_preview)
+
     def update_display(self, command):
         """Handles button clicks and updates the display."""
         result = command()
@@ -96,6 +162,41 @@ class CalculatorButtons:
         else:
             self.display.update(result)
         self.display.update_memory(self.logic.memory)
+        ## Results in formula mode follow the angle mode, and "(" or ")" start formula mode
+        if self.logic.formula_line is not None:
+            self.update_formula(self.logic.formula_text())
+        else:
+            self.display.update_preview("")
+
+    def show_exact_factorial(self):
+        """Starts computing the exact digits of n! in the background."""
+        try:
+            future = self.logic.exact_factorial_digits()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return self.logic.current
+        self.frame.after(EXACT_POLL_MS, self.poll_exact_factorial, future, self.logic.current)
+        return self.logic.current
+
+    def poll_exact_factorial(self, future, n):
+        """Shows the exact digits of n! in a window once they are ready."""
+        if not future.done():
+            self.frame.after(EXACT_POLL_MS, self.poll_exact_factorial, future, n)
+            return
+        try:
+            digits = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to compute {n}!: {e}")
+            return
+        window = tk.Toplevel(self.frame)
+        window.title(f"{n}! ({len(digits)} digits)")
+        text = tk.Text(window, wrap="char", width=80, height=20)
+        scrollbar = ttk.Scrollbar(window, command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        text.pack(side="left", fill="both", expand=True)
+        text.insert("1.0", digits)
+        text.configure(state="disabled")
 
     def update_theme(self, colors):
         """Updates button theme (handled via ttk.Style in main.py)."""
@@ -1,24 +1,62 @@
 import math
-import cmath
-import numpy as np
+import operator
+import sys
+from decimal import Decimal
+from expressions import ExpressionCache, normalize_expression
+from history import FORMULA, HistoryStore, format_record
+from operations import SCIENTIFIC_OPERATIONS, apply_array
+import precision
+import formula
+import gamma
+import profiling
+from units import UnitRegistry
+
+##Keypad binary operations on float and complex operands
+BINARY_OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "^": operator.pow,
+    "mod": operator.mod,
+}
+
+def beyond_float(value):
+    """Returns True for a real value that float mode holds exactly or as a Decimal because no float can."""
+    return isinstance(value, Decimal) or (isinstance(value, int) and abs(value) > sys.float_info.max)
 
 class CalculatorLogic:
-    def __init__(self):
+    def __init__(self, history_path=None):
         self.memory = 0.0
-        self.current = "0"
+        ##The operand is held as a number; entry keeps the text while digits are being typed
+        ##and value is None until that text is first used as a number
+        self.value = None
+        self.entry = "0"
+        self.error = False
         self.operation = None
         self.previous = None
         self.is_radians = True
-        self.history = []
+        ##"float" (default), or "decimal"/"fraction" at precision_digits significant digits
+        self.precision_mode = "float"
+        self.precision_digits = 28
+        ##Whole formula typed in formula mode, or None while the keypad works one operation at a time
+        self.formula_line = None
+        self.formula_parser = None
+        self.history = HistoryStore(path=history_path)
+        self.expression_cache = ExpressionCache()
+        ##Roots, extrema and integrals per (method, expression, interval); created on first use
+        self.analysis_cache = None
+        self.units = UnitRegistry()
+        ##Named conversions used by the keypad; any "<from>_to_<to>" pair of catalog units also works
         self.unit_conversions = {
-            "m_to_cm": lambda x: x * 100,
-            "cm_to_m": lambda x: x / 100,
-            "kg_to_g": lambda x: x * 1000,
-            "g_to_kg": lambda x: x / 1000,
-            "c_to_f": lambda x: (x * 9/5) + 32,
-            "f_to_c": lambda x: (x - 32) * 5/9,
-            "km_to_m": lambda x: x * 1000,
-            "m_to_km": lambda x: x / 1000,
+            "m_to_cm": ("m", "cm"),
+            "cm_to_m": ("cm", "m"),
+            "kg_to_g": ("kg", "g"),
+            "g_to_kg": ("g", "kg"),
+            "c_to_f": ("degC", "degF"),
+            "f_to_c": ("degF", "degC"),
+            "km_to_m": ("km", "m"),
+            "m_to_km": ("m", "km"),
         }
         self.constants = {
             "π": math.pi,
@@ -27,6 +65,77 @@ class CalculatorLogic:
             "g": 9.80665,    # Acceleration due to gravity in m/s²
         }
 
+    @property
+    def current(self):
+        """The display text: the digits being typed, the formatted value, or "Error"."""
+        if self.error:
+            return "Error"
+        if self.entry is not None:
+            return self.entry
+        try:
+            return str(self.value)
+        except ValueError:
+            ## Integers too long to convert to text
+            return "Error"
+
+    @current.setter
+    def current(self, text):
+        """Replaces the operand with text, which is parsed when next used as a number."""
+        self.error = text == "Error"
+        self.entry = None if self.error else text
+        self.value = None
+
+    def operand(self):
+        """Returns the current value as a number, parsing typed digits only once."""
+        if self.error:
+            raise ValueError("Error")
+        if self.value is None:
+            self.value = self.parse_number(self.entry)
+        return self.value
+
+    def parse_number(self, text):
+        """Parses typed digits as a complex number (with j) or a real of the precision mode's type."""
+        if "j" in text:
+            return complex(text)
+        if self.precision_mode == "float":
+            return float(text)
+        return precision.parse(text, self.precision_mode)
+
+    def real_operand(self):
+        """Returns the current value as a real number of the precision mode's type."""
+        return self.as_real(self.operand())
+
+    def as_real(self, value):
+        """Returns value as a real number of the precision mode's type; complex values raise TypeError."""
+        if isinstance(value, complex):
+            raise TypeError("complex value")
+        if self.precision_mode == "float" and not beyond_float(value):
+            return float(value)
+        return value
+
+    def to_mode(self, value):
+        """Converts a real number to the precision mode's type; float mode keeps values too large for a float."""
+        if self.precision_mode == "float" and beyond_float(value):
+            return value
+        return precision.convert(value, self.precision_mode)
+
+    def wide_float(self, value):
+        """Returns a Decimal result of float mode as a float when it fits in one."""
+        as_float = float(value)
+        return as_float if math.isfinite(as_float) else value
+
+    def set_value(self, value):
+        """Makes value the current operand."""
+        self.value = value
+        self.entry = None
+        self.error = False
+
+    def set_error(self):
+        """Puts the calculator in the error state."""
+        self.error = True
+        self.entry = None
+        self.value = None
+
     def clear(self):
         """Clears the current calculation."""
         self.current = "0"
@@ -46,159 +155,283 @@ class CalculatorLogic:
 
     def memory_recall(self):
         """Recalls the memory value."""
-        self.current = str(self.memory)
+        with precision.context(self.precision_digits):
+            self.set_value(self.memory_value())
         return self.current
 
+    def memory_value(self):
+        """Returns the memory as a number of the precision mode's type."""
+        return self.to_mode(self.memory)
+
     def memory_add(self):
         """Adds the current value to memory."""
         try:
-            self.memory += float(self.current)
-        except ValueError:
+            self.memory = self.binary_operation("+", self.memory_value(), self.real_operand())
+        except (ValueError, TypeError, ArithmeticError):
             pass
         return self.current
 
     def memory_subtract(self):
         """Subtracts the current value from memory."""
         try:
-            self.memory -= float(self.current)
-        except ValueError:
+            self.memory = self.binary_operation("-", self.memory_value(), self.real_operand())
+        except (ValueError, TypeError, ArithmeticError):
             pass
         return self.current
 
     def memory_store(self):
-        """Stores the current value in memory."""
+        """Stores the current value in memory, in the precision mode's type."""
         try:
-            self.memory = float(self.current)
-        except ValueError:
+            with precision.context(self.precision_digits):
+                self.memory = self.to_mode(self.real_operand())
+        except (ValueError, TypeError, ArithmeticError):
             pass
         return self.current
 
     def append_digit(self, digit):
         """Appends a digit to the current value."""
-        if self.current == "0":
+        text = "0" if self.error else self.current
+        if text == "0":
             self.current = digit
         else:
-            self.current += digit
+            self.current = text + digit
         return self.current
 
     def append_decimal(self):
         """Appends a decimal point to the current value."""
-        if "." not in self.current:
-            self.current += "."
+        text = "0" if self.error else self.current
+        if "." not in text:
+            self.current = text + "."
         return self.current
 
     def negate(self):
         """Negates the current value."""
-        if self.current.startswith("-"):
-            self.current = self.current[1:]
+        if self.error:
+            return self.current
+        if self.entry is None:
+            self.set_value(-self.value)
+        elif self.entry.startswith("-"):
+            self.current = self.entry[1:]
         else:
-            self.current = "-" + self.current
+            self.current = "-" + self.entry
         return self.current
 
     def percent(self):
         """Converts the current value to a percentage."""
         try:
-            self.current = str(float(self.current) / 100)
-        except ValueError:
+            self.set_value(self.real_operand() / 100)
+        except (ValueError, TypeError):
             pass
         return self.current
 
     def append_complex(self):
         """Appends 'j' for complex numbers."""
-        self.current += "j"
+        if not self.error:
+            self.current = self.current + "j"
         return self.current
 
     def set_operation(self, op):
         """Sets the operation and stores the previous value."""
         if self.previous is None:
             try:
-                self.previous = float(self.current) if "j" not in self.current else complex(self.current)
+                self.previous = self.operand()
             except ValueError:
-                self.previous = self.current
+                self.set_error()
+                return self.current
         elif self.operation:
             self.evaluate()
         self.operation = op
         self.current = "0"
         return self.current
 
+    @profiling.timed("calculator.evaluate")
     def evaluate(self):
         """Evaluates the current expression."""
         if self.previous is not None and self.operation:
             try:
-                curr = float(self.current) if "j" not in self.current else complex(self.current)
+                curr = self.operand()
                 prev = self.previous
-                if self.operation == "+":
-                    result = prev + curr
-                elif self.operation == "-":
-                    result = prev - curr
-                elif self.operation == "*":
-                    result = prev * curr
-                elif self.operation == "/":
-                    if curr == 0:
-                        raise ZeroDivisionError("Division by zero")
-                    result = prev / curr
-                elif self.operation == "^":
-                    result = prev ** curr
-                elif self.operation == "mod":
-                    result = prev % curr
-                self.history.append(f"{prev} {self.operation} {curr} = {result}")
-                self.current = str(result)
+                result = self.binary_operation(self.operation, prev, curr)
+                self.history.add(prev, self.operation, curr, result)
+                self.set_value(result)
                 self.previous = None
                 self.operation = None
             except Exception as e:
-                self.current = "Error"
+                self.set_error()
                 self.previous = None
                 self.operation = None
         return self.current
 
+    def mode_key(self):
+        """Returns the settings a computed value depends on: angle mode, precision mode and digits."""
+        return (self.is_radians, self.precision_mode, self.precision_digits)
+
+    def toggle_formula_mode(self):
+        """Switches between keypad entry and typing whole formulas; returns the text to display."""
+        self.formula_line = "" if self.formula_line is None else None
+        return self.formula_text() if self.formula_line is not None else self.current
+
+    def formula_text(self):
+        """Returns the formula as displayed, "0" while it is empty."""
+        return self.formula_line or "0"
+
+    def formula_input(self, text):
+        """Appends typed text to the formula, entering formula mode if needed, and returns the formula."""
+        self.formula_line = (self.formula_line or "") + text
+        return self.formula_text()
+
+    def formula_backspace(self):
+        """Removes the last character of the formula."""
+        self.formula_line = self.formula_line.rstrip()[:-1]
+        return self.formula_text()
+
+    def formula_clear(self):
+        """Empties the formula."""
+        self.formula_line = ""
+        return self.formula_text()
+
+    def formula_value(self):
+        """Parses and evaluates the formula; raises ValueError while it is incomplete or invalid.
+
+        The parser and the evaluated subtrees are cached, so calling this
+        after every keystroke only does the work the keystroke changed.
+        """
+        if self.formula_parser is None:
+            self.formula_parser = formula.FormulaParser(SCIENTIFIC_OPERATIONS, self.constants)
+        return formula.evaluate(self.formula_parser.parse(self.formula_line), self)
+
+    def formula_preview(self):
+        """Returns the formula's value as display text, or "" while it is empty, incomplete or invalid."""
+        if not self.formula_line or not self.formula_line.strip():
+            return ""
+        try:
+            return str(self.formula_value())
+        except (ValueError, RecursionError):
+            return ""
+
+    @profiling.timed("calculator.evaluate_formula")
+    def evaluate_formula(self):
+        """Evaluates the formula into the current value, records it in the history and starts a new formula."""
+        try:
+            result = self.formula_value()
+        except (ValueError, RecursionError):
+            self.set_error()
+            return self.current
+        self.history.add(self.formula_line, FORMULA, None, result)
+        self.set_value(result)
+        self.formula_line = ""
+        return self.current
+
+    def binary_operation(self, op, prev, curr):
+        """Applies a keypad operation ("+", "-", "*", "/", "^" or "mod") to two operands in the precision mode."""
+        if self.precision_mode != "float" and not isinstance(prev, complex) and not isinstance(curr, complex):
+            with precision.context(self.precision_digits):
+                return self.precise_binary_operation(prev, curr, op)
+        if (beyond_float(prev) or beyond_float(curr)) and not isinstance(prev, complex) and not isinstance(curr, complex):
+            ## Float mode carries results too large for a float, such as 1001!, as Decimals
+            with precision.context(gamma.APPROX_DIGITS):
+                prev, curr = precision.to_decimal(prev), precision.to_decimal(curr)
+                if op == "^":
+                    return self.wide_float(precision.power(prev, curr, "decimal", gamma.APPROX_DIGITS))
+                return self.wide_float(self.precise_binary_operation(prev, curr, op))
+        if op == "/" and curr == 0:
+            raise ZeroDivisionError("Division by zero")
+        ## Complex arithmetic is in floats; Decimal and Fraction do not mix with complex
+        if isinstance(prev, complex) or isinstance(curr, complex):
+            prev, curr = (value if isinstance(value, complex) else float(value) for value in (prev, curr))
+        return BINARY_OPERATIONS[op](prev, curr)
+
+    def precise_binary_operation(self, prev, curr, op=None):
+        """Applies op, by default the pending operation, to Decimal or Fraction operands."""
+        op = op or self.operation
+        if op == "/" and curr == 0:
+            raise ZeroDivisionError("Division by zero")
+        if op == "^":
+            return precision.power(prev, curr, self.precision_mode, self.precision_digits)
+        result = BINARY_OPERATIONS[op](prev, curr)
+        ## Decimal % keeps the sign of the dividend; mod follows the divisor as it does for floats and fractions
+        if op == "mod" and isinstance(result, Decimal) and result and (result < 0) != (curr < 0):
+            result += curr
+        return +result if isinstance(result, Decimal) else result
+
+    def set_precision(self, mode, digits=None):
+        """Switches between float, decimal and fraction arithmetic, converting the held values."""
+        if mode not in precision.PRECISION_MODES:
+            raise ValueError(f"Unknown precision mode: {mode}")
+        if digits is not None:
+            if digits < 1:
+                raise ValueError("Precision must be at least one digit")
+            self.precision_digits = digits
+        self.precision_mode = mode
+        with precision.context(self.precision_digits):
+            if self.value is not None and not isinstance(self.value, complex):
+                self.set_value(precision.convert(self.value, mode))
+            elif self.entry is not None:
+                self.current = self.entry
+            if self.previous is not None and not isinstance(self.previous, complex):
+                self.previous = precision.convert(self.previous, mode)
+        return self.current
+
+    @profiling.timed("calculator.scientific_operation")
     def scientific_operation(self, op):
         """Performs a scientific operation on the current value."""
         try:
-            value = float(self.current) if "j" not in self.current else complex(self.current)
-            angle_func = lambda x: x if self.is_radians else math.radians(x)
-            if op == "sin":
-                result = math.sin(angle_func(value)) if isinstance(value, (int, float)) else cmath.sin(value)
-            elif op == "cos":
-                result = math.cos(angle_func(value)) if isinstance(value, (int, float)) else cmath.cos(value)
-            elif op == "tan":
-                result = math.tan(angle_func(value)) if isinstance(value, (int, float)) else cmath.tan(value)
-            elif op == "sinh":
-                result = math.sinh(value) if isinstance(value, (int, float)) else cmath.sinh(value)
-            elif op == "cosh":
-                result = math.cosh(value) if isinstance(value, (int, float)) else cmath.cosh(value)
-            elif op == "tanh":
-                result = math.tanh(value) if isinstance(value, (int, float)) else cmath.tanh(value)
-            elif op == "asin":
-                result = math.asin(value) if isinstance(value, (int, float)) else cmath.asin(value)
-            elif op == "acos":
-                result = math.acos(value) if isinstance(value, (int, float)) else cmath.acos(value)
-            elif op == "atan":
-                result = math.atan(value) if isinstance(value, (int, float)) else cmath.atan(value)
-            elif op == "log":
-                result = math.log10(value) if isinstance(value, (int, float)) else cmath.log10(value)
-            elif op == "ln":
-                result = math.log(value) if isinstance(value, (int, float)) else cmath.log(value)
-            elif op == "sqrt":
-                result = math.sqrt(value) if isinstance(value, (int, float)) else cmath.sqrt(value)
-            elif op == "exp":
-                result = math.exp(value) if isinstance(value, (int, float)) else cmath.exp(value)
-            self.current = str(result)
+            self.set_value(self.scientific_value(op, self.operand()))
         except Exception:
-            self.current = "Error"
+            self.set_error()
         return self.current
 
+    def scientific_value(self, op, value):
+        """Applies a scientific operation to a number, honouring the angle and precision modes."""
+        operation = SCIENTIFIC_OPERATIONS[op]
+        if isinstance(value, complex):
+            return operation.complex(value)
+        if self.precision_mode != "float":
+            return precision.scientific(op, value, self.precision_mode, self.precision_digits, self.is_radians)
+        if beyond_float(value):
+            ## The angle is reduced modulo 2 pi, which needs every integer digit of the operand
+            if op in precision.ANGLE_FUNCTIONS and isinstance(value, Decimal):
+                raise ValueError(f"{op} needs the exact value of an operand this large")
+            return self.wide_float(precision.scientific(op, value, "decimal", gamma.APPROX_DIGITS, self.is_radians))
+        if self.is_radians:
+            return operation.real(value)
+        return operation.real_degrees(value)
+
+    def scientific_operation_array(self, op, values):
+        """Applies a scientific operation to a whole real or complex array, honouring the angle mode."""
+        try:
+            return apply_array(op, values, self.is_radians)
+        except KeyError:
+            raise ValueError(f"Unknown operation: {op}")
+
+    @profiling.timed("calculator.factorial")
     def factorial(self):
-        """Calculates the factorial of the current value."""
+        """Calculates the factorial of the current value, via gamma for non-integers."""
         try:
-            value = int(float(self.current))
-            if value < 0:
-                self.current = "Error"
-            else:
-                self.current = str(math.factorial(value))
-        except ValueError:
-            self.current = "Error"
+            self.set_value(self.factorial_value(self.operand()))
+        except (ValueError, TypeError, ArithmeticError):
+            self.set_error()
         return self.current
 
+    def factorial_value(self, value):
+        """Returns value!, via gamma for non-integers, in the precision mode's type."""
+        result = gamma.factorial(self.as_real(value))
+        if isinstance(result, float) and self.precision_mode != "float":
+            result = precision.convert(result, self.precision_mode)
+        return result
+
+    def exact_factorial_digits(self):
+        """Starts computing all digits of n! in a worker process and returns a Future of the digit string."""
+        try:
+            value = self.real_operand()
+            if value != int(value) or value < 0:
+                raise ValueError("exact digits need a non-negative integer")
+            if value > gamma.EXACT_DIGITS_LIMIT:
+                raise ValueError(f"exact digits are limited to n <= {gamma.EXACT_DIGITS_LIMIT}")
+        except (TypeError, ArithmeticError) as e:
+            raise ValueError(str(e))
+        return gamma.submit_exact_digits(int(value))
+
     def toggle_angle_mode(self):
         """Toggles between radians and degrees."""
         self.is_radians = not self.is_radians
@@ -206,47 +439,255 @@ class CalculatorLogic:
 
     def convert_unit(self, conversion):
         """Converts the current value using the specified unit conversion."""
+        if conversion in self.unit_conversions:
+            from_unit, to_unit = self.unit_conversions[conversion]
+        else:
+            from_unit, _, to_unit = conversion.partition("_to_")
+        return self.convert_units(from_unit, to_unit)
+
+    def convert_units(self, from_unit, to_unit):
+        """Converts the current value between any two units of the same dimension."""
         try:
-            value = float(self.current)
-            result = self.unit_conversions[conversion](value)
-            self.current = str(result)
-        except ValueError:
-            self.current = "Error"
+            value = self.real_operand()
+            if self.precision_mode == "float":
+                scale, offset = self.units.factors(from_unit, to_unit)
+                self.set_value(value * scale + offset)
+            else:
+                scale, offset = self.units.exact_factors(from_unit, to_unit)
+                with precision.context(self.precision_digits):
+                    scale = precision.convert(scale, self.precision_mode)
+                    offset = precision.convert(offset, self.precision_mode)
+                    self.set_value(value * scale + offset)
+        except (ValueError, TypeError):
+            self.set_error()
         return self.current
 
     def insert_constant(self, constant):
         """Inserts a constant into the current value."""
-        self.current = str(self.constants[constant])
+        self.set_value(self.constant_value(constant))
         return self.current
 
-    def get_history(self):
-        """Returns the calculation history."""
-        return "\n".join(self.history) if self.history else "No history"
+    def constant_value(self, constant):
+        """Returns a named constant in the precision mode's type."""
+        if self.precision_mode == "float":
+            return self.constants[constant]
+        if constant in ("π", "e"):
+            value = precision.pi(self.precision_digits) if constant == "π" else precision.e(self.precision_digits)
+            return precision.convert(value, self.precision_mode)
+        return precision.convert(Decimal(str(self.constants[constant])), self.precision_mode)
+
+    def get_history(self, count=10):
+        """Returns the newest count entries of the calculation history."""
+        records = self.history.last(count)
+        return "\n".join(format_record(record) for record in records) if records else "No history"
 
+    @profiling.timed("calculator.evaluate_function")
     def evaluate_function(self, func_str, x):
         """Safely evaluates a user-defined function for a given x."""
         try:
-            safe_dict = {
-                'sin': math.sin,
-                'cos': math.cos,
-                'tan': math.tan,
-                'log': math.log10,
-                'ln': math.log,
-                'sqrt': math.sqrt,
-                'exp': math.exp,
-                'pi': math.pi,
-                'e': math.e,
-                'x': x,
-            }
-            return eval(func_str, {"__builtins__": None}, safe_dict)
+            return self.expression_cache.get(func_str).scalar({"x": x})
         except Exception as e:
             raise ValueError(f"Invalid function: {e}")
 
-    def graph_function(self, func_str, x_min, x_max, num_points=400):
-        """Graphs the user-defined function over the specified range."""
+    @profiling.timed("calculator.evaluate_expression")
+    def evaluate_expression(self, func_str, variables):
+        """Safely evaluates a user-defined expression with the given variable values."""
+        try:
+            return self.expression_cache.get(func_str, tuple(variables)).scalar(variables)
+        except Exception as e:
+            raise ValueError(f"Invalid function: {e}")
+
+    def evaluate_function_array(self, func_str, x_values):
+        """Evaluates a user-defined function over a whole array of x in one call."""
+        return self.evaluate_expression_array(func_str, {"x": x_values})
+
+    @profiling.timed("calculator.evaluate_expression_array")
+    def evaluate_expression_array(self, func_str, variables):
+        """Evaluates a user-defined expression over arrays of variable values in one call.
+
+        The arrays are broadcast against each other, so a row and a column
+        give the full grid. Domain errors (log of a negative, division by
+        zero, ...) become NaN entries in the returned float64 array instead
+        of raising.
+        """
+        import numpy as np
+        try:
+            expr = self.expression_cache.get(func_str, tuple(variables))
+        except ValueError as e:
+            raise ValueError(f"Invalid function: {e}")
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in variables.items()}
+        shape = np.broadcast_shapes(*(values.shape for values in arrays.values()))
+        try:
+            with np.errstate(all="ignore"):
+                return self._real_array(expr.array(arrays), shape)
+        except Exception as e:
+            raise ValueError(f"Invalid function: {e}")
+
+    @profiling.timed("calculator.evaluate_derivative_array")
+    def evaluate_derivative_array(self, func_str, x_values):
+        """Evaluates a user-defined function and its derivative over an array of x in one pass.
+
+        The derivative is generated by forward-mode differentiation of the
+        simplified expression, so f and f' share their common subexpressions.
+        Returns float64 arrays (y, dy), NaN wherever f is undefined.
+        """
+        import numpy as np
+        try:
+            expr = self.expression_cache.get(func_str).with_derivative()
+        except ValueError as e:
+            raise ValueError(f"Invalid function: {e}")
+        x_values = np.asarray(x_values, dtype=np.float64)
+        try:
+            with np.errstate(all="ignore"):
+                y_values, dy_values = (self._real_array(result, x_values.shape) for result in expr.array({"x": x_values}))
+        except Exception as e:
+            raise ValueError(f"Invalid function: {e}")
+        dy_values[np.isnan(y_values)] = np.nan
+        return y_values, dy_values
+
+    def derivative_expression(self, func_str):
+        """Returns the simplified text of the derivative of a user-defined function."""
+        try:
+            return self.expression_cache.get(func_str).derivative().text
+        except ValueError as e:
+            raise ValueError(f"Invalid function: {e}")
+
+    @staticmethod
+    def _real_array(result, shape):
+        """Broadcasts an evaluation result to shape as float64, with complex and non-finite entries as NaN."""
+        import numpy as np
+        result = np.asarray(result)
+        if np.iscomplexobj(result):
+            result = np.where(result.imag == 0, result.real, np.nan)
+        values = np.array(np.broadcast_to(result, shape), dtype=np.float64)
+        values[~np.isfinite(values)] = np.nan
+        return values
+
+    @profiling.timed("calculator.graph_function")
+    def graph_function(self, func_str, x_min, x_max, num_points=400, vectorized=True):
+        """Graphs the user-defined function over the specified range.
+
+        With vectorized=True the function is evaluated over all points at once
+        and y is returned as a float64 array; otherwise it is evaluated point by
+        point and y is returned as a list.
+        """
+        import numpy as np
+        profiling.count("graph_function.points", num_points)
         try:
             x_values = np.linspace(x_min, x_max, num_points)
-            y_values = [self.evaluate_function(func_str, x) for x in x_values]
+            if vectorized:
+                y_values = self.evaluate_function_array(func_str, x_values)
+            else:
+                y_values = [self.evaluate_function(func_str, x) for x in x_values]
             return x_values, y_values
         except Exception as e:
-            raise ValueError(f"Error plotting function: {e}")
\ No newline at end of file
+            raise ValueError(f"Error plotting function: {e}")
+
+    @profiling.timed("calculator.graph_function_adaptive")
+    def graph_function_adaptive(self, func_str, x_min, x_max, x_pixels=500, y_pixels=400):
+        """Graphs the user-defined function with adaptive sampling at the given pixel resolution."""
+        from sampling import adaptive_sample
+        try:
+            return adaptive_sample(lambda x: self.evaluate_function_array(func_str, x), x_min, x_max, x_pixels, y_pixels)
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    def graph_derivative(self, func_str, x_min, x_max, num_points=400):
+        """Graphs a user-defined function and its derivative, returning (x, y, dy)."""
+        import numpy as np
+        try:
+            x_values = np.linspace(x_min, x_max, num_points)
+            return (x_values, *self.evaluate_derivative_array(func_str, x_values))
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    def graph_parametric(self, x_str, y_str, t_min, t_max, num_points=400):
+        """Graphs the parametric curve (x(t), y(t)) over the specified range of t."""
+        import numpy as np
+        try:
+            t_values = np.linspace(t_min, t_max, num_points)
+            return self.evaluate_expression_array(x_str, {"t": t_values}), self.evaluate_expression_array(y_str, {"t": t_values})
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    def graph_polar(self, r_str, theta_min, theta_max, num_points=400):
+        """Graphs the polar curve r(theta) over the specified range and returns it in x, y coordinates.
+
+        The angle can be written as theta or θ.
+        """
+        import numpy as np
+        try:
+            theta = np.linspace(theta_min, theta_max, num_points)
+            r_values = self.evaluate_expression_array(r_str, {"theta": theta, "θ": theta})
+            return r_values * np.cos(theta), r_values * np.sin(theta)
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    @profiling.timed("calculator.graph_surface")
+    def graph_surface(self, func_str, x_min, x_max, y_min, y_max, resolution=200):
+        """Evaluates f(x, y) over a resolution x resolution grid for contour and heatmap plots.
+
+        Returns the x and y axis values and a 2D array of f with one row per y.
+        The grid is evaluated in a single broadcast pass over a row of x and a
+        column of y.
+        """
+        import numpy as np
+        try:
+            x_values = np.linspace(x_min, x_max, resolution)
+            y_values = np.linspace(y_min, y_max, resolution)
+            z_values = self.evaluate_expression_array(func_str, {"x": x_values[np.newaxis, :], "y": y_values[:, np.newaxis]})
+            return x_values, y_values, z_values
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    @profiling.timed("calculator.graph_sweep")
+    def graph_sweep(self, func_str, parameter, values, x_min, x_max, num_points=400, pool=None):
+        """Graphs f(x) for every value of a parameter, e.g. sin(k*x) for k in 1..50.
+
+        Returns x and a 2D array with one row of y per value, evaluated in a
+        single broadcast pass over a column of values and a row of x, or in
+        chunks (across pool if given) when that pass would be too large; see
+        sweeps.evaluate_sweep.
+        """
+        import numpy as np
+        import sweeps
+        profiling.count("graph_sweep.samples", len(values) * num_points)
+        try:
+            x_values = np.linspace(x_min, x_max, num_points)
+            return x_values, sweeps.evaluate_sweep(self, func_str, parameter, values, x_values, pool)
+        except Exception as e:
+            raise ValueError(f"Error plotting function: {e}")
+
+    @profiling.timed("calculator.analyze_function")
+    def analyze_function(self, method, func_str, x_min, x_max):
+        """Runs one analysis.py method ("roots", "extrema" or "integral") on [x_min, x_max].
+
+        Results are cached per (method, expression, interval), so marking the
+        same plot again costs nothing.
+        """
+        import analysis
+        if self.analysis_cache is None:
+            self.analysis_cache = analysis.AnalysisCache()
+        compute = {"roots": analysis.find_roots, "extrema": analysis.find_extrema, "integral": analysis.integrate}[method]
+        func = lambda x: self.evaluate_function_array(func_str, x)
+        key = (method, normalize_expression(func_str), x_min, x_max)
+        try:
+            return self.analysis_cache.get(key, lambda: compute(func, x_min, x_max))
+        except ValueError as e:
+            raise ValueError(f"Error analysing function: {e}")
+
+    def find_roots(self, func_str, x_min, x_max):
+        """Returns the roots of a user-defined function on [x_min, x_max] as an array."""
+        return self.analyze_function("roots", func_str, x_min, x_max)
+
+    def find_extrema(self, func_str, x_min, x_max):
+        """Returns (minima, maxima), the x positions of the local extrema on [x_min, x_max]."""
+        return self.analyze_function("extrema", func_str, x_min, x_max)
+
+    def integrate(self, func_str, x_min, x_max):
+        """Returns (integral, error estimate) of a user-defined function over [x_min, x_max]."""
+        return self.analyze_function("integral", func_str, x_min, x_max)
+
+    def differentiate(self, func_str, x_values):
+        """Returns the exact derivative of a user-defined function at every x, by automatic differentiation."""
+        return self.evaluate_derivative_array(func_str, x_values)[1]
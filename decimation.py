@@ -0,0 +1,54 @@
+import numpy as np
+
+def is_increasing(x):
+    """Returns True if x never decreases, the case min_max_decimate is valid for."""
+    x = np.asarray(x, dtype=np.float64)
+    return bool(np.all(x[1:] >= x[:-1]))
+
+def min_max_decimate(x, y, columns):
+    """Reduces a curve with increasing x to at most about four points per column, keeping its envelope.
+
+    The x range is split into columns bins of equal width; from each bin
+    the first, last, minimum and maximum samples are kept in their original
+    order, so peaks survive and the drawn curve is the same at that
+    resolution however unevenly the samples are spaced. The first undefined
+    (NaN) sample of every gap is kept too, so breaks in the curve stay
+    breaks. Curves already that small are returned unchanged.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if columns < 1 or n <= 4 * columns:
+        return x, y
+    ## x increases, so each bin is the run of samples from the first at or past its left edge; empty bins drop out
+    edges = np.linspace(x[0], x[-1], columns + 1)
+    starts = np.unique(np.searchsorted(x, edges[:-1], "left"))
+    finite = np.isfinite(y)
+    if finite.all():
+        low = high = y
+        gaps = []
+    else:
+        low = np.where(finite, y, np.inf)
+        high = np.where(finite, y, -np.inf)
+        gaps = np.flatnonzero(~finite & np.concatenate(([True], finite[:-1])))
+    keep = np.unique(np.concatenate((
+        starts, starts[1:] - 1, [n - 1], _bin_extremes(low, starts, np.minimum), _bin_extremes(high, starts, np.maximum), gaps,
+    )).astype(np.intp))
+    return x[keep], y[keep]
+
+def _bin_extremes(values, starts, ufunc):
+    """Returns the index of the first extreme by ufunc in every bin of values beginning at starts."""
+    sizes = np.diff(starts, append=len(values))
+    index = np.flatnonzero(values == np.repeat(ufunc.reduceat(values, starts), sizes))
+    bins = np.searchsorted(starts, index, "right")
+    return index[np.flatnonzero(np.diff(bins, prepend=0))]
+
+def decimate_range(x, y, x_min, x_max, columns):
+    """Decimates the part of a curve with increasing x that lies in [x_min, x_max].
+
+    One sample beyond each end of the range is kept so that the line runs
+    to the edges of the view.
+    """
+    start = max(int(np.searchsorted(x, x_min, "left")) - 1, 0)
+    stop = int(np.searchsorted(x, x_max, "right")) + 1
+    return min_max_decimate(x[start:stop], y[start:stop], columns)
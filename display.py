@@ -1,22 +1,43 @@
 import tkinter as tk
 from tkinter import ttk
+import profiling
+from history import format_record
+
+##Rows of the history view; older records are reached by scrolling over it
+HISTORY_ROWS = 5
+##Characters of a history record shown before it is cut short, so rows never wrap
+HISTORY_CHARS = 90
 
 class CalculatorDisplay:
+    """The calculator's display, redrawn at most once per Tk idle cycle.
+
+    The update methods only note the new value of a field and schedule a
+    flush with after_idle, so a burst of key presses or pasted input costs
+    one dictionary write per update and the labels are set once, with the
+    last value, when Tk next goes idle. Values that have not changed since
+    they were last shown are not set again. Values may be given as callables
+    to defer computing them to the flush.
+    """
+
     def __init__(self, parent, logic):
         self.logic = logic
         self.frame = ttk.Frame(parent)
         self.frame.grid(row=0, column=0, columnspan=5, sticky="nsew", padx=5, pady=5)
 
-        ##History display
-        self.history_var = tk.StringVar(value="History")
-        self.history_label = ttk.Label(
-            self.frame,
-            textvariable=self.history_var,
-            font=("Arial", 10),
-            anchor="w",
-            wraplength=580
-        )
-        self.history_label.pack(fill="x", pady=2)
+        ##History display: a fixed set of one-line rows showing the newest records
+        self.history_frame = ttk.Frame(self.frame)
+        self.history_frame.pack(fill="x", pady=2)
+        self.history_vars = [tk.StringVar(value="History" if i == 0 else "") for i in range(HISTORY_ROWS)]
+        self.history_labels = []
+        for var in self.history_vars:
+            label = ttk.Label(self.history_frame, textvariable=var, font=("Arial", 10), anchor="w")
+            label.pack(fill="x")
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                label.bind(sequence, self.on_history_scroll)
+            self.history_labels.append(label)
+        self.history_offset = 0
+        self.history_shown = None
+        self.history_texts = [var.get() for var in self.history_vars]
 
         ##Main display
         self.main_var = tk.StringVar(value="0")
@@ -29,6 +50,16 @@ class CalculatorDisplay:
         )
         self.main_display.pack(fill="both", expand=True)
 
+        ##Live result of the formula being typed in formula mode
+        self.preview_var = tk.StringVar(value="")
+        self.preview_label = ttk.Label(
+            self.frame,
+            textvariable=self.preview_var,
+            font=("Arial", 14),
+            anchor="e"
+        )
+        self.preview_label.pack(fill="x")
+
         ##Indicators
         self.indicator_frame = ttk.Frame(self.frame)
         self.indicator_frame.pack(fill="x")
@@ -47,25 +78,106 @@ class CalculatorDisplay:
         self.memory_label.pack(side="left", padx=5)
         self.mode_label.pack(side="right", padx=5)
 
+        ##Fields waiting for the next flush, and the text each field shows now
+        self.fields = {"main": self.main_var, "preview": self.preview_var, "memory": self.memory_var, "mode": self.mode_var}
+        self.shown = {"main": "0", "preview": "", "memory": "", "mode": "RAD"}
+        self.dirty = {}
+        self.history_dirty = False
+        self.flush_pending = False
+
+    def mark(self, field, value):
+        """Notes the new value of a field and schedules a flush if none is pending."""
+        if field in self.dirty:
+            profiling.count("display.coalesced")
+        self.dirty[field] = value
+        self.schedule()
+
+    def schedule(self):
+        if not self.flush_pending:
+            self.flush_pending = True
+            self.frame.after_idle(self.flush)
+
+    def flush(self):
+        """Sets every field changed since the last flush to its newest value."""
+        with profiling.span("display.flush"):
+            self.flush_pending = False
+            dirty, self.dirty = self.dirty, {}
+            for field, value in dirty.items():
+                text = str(value() if callable(value) else value)
+                if text != self.shown[field]:
+                    self.shown[field] = text
+                    self.fields[field].set(text)
+            if self.history_dirty:
+                self.history_dirty = False
+                self.render_history()
+
     def update(self, value):
         """Updates the main display with the given value."""
-        self.main_var.set(value)
+        self.mark("main", value)
+
+    def update_preview(self, value):
+        """Shows the live result of the formula, or nothing; value may be a callable returning it."""
+        if callable(value):
+            self.mark("preview", lambda: self._preview_text(value()))
+        else:
+            self.mark("preview", self._preview_text(value))
+
+    def _preview_text(self, value):
+        return f"= {value}" if value else ""
 
     def update_memory(self, value):
         """Updates the memory indicator."""
-        self.memory_var.set("M" if value != 0 else "")
+        self.mark("memory", "M" if value != 0 else "")
 
     def update_mode(self, mode):
         """Updates the angle mode indicator."""
-        self.mode_var.set(mode)
+        self.mark("mode", mode)
 
     def update_history(self):
-        """Updates the history display."""
-        self.history_var.set(self.logic.get_history())
+        """Updates the history display, scrolled back to the newest records."""
+        if self.history_dirty:
+            profiling.count("display.coalesced")
+        self.history_offset = 0
+        self.history_dirty = True
+        self.schedule()
+
+    def render_history(self):
+        """Sets the history rows to the records in view; rows whose record is unchanged are left alone.
+
+        Only HISTORY_ROWS records are read and formatted, however long the
+        history is, and rows are cut to HISTORY_CHARS so none of them wraps.
+        """
+        records = self.logic.history.last(HISTORY_ROWS, self.history_offset)
+        if records == self.history_shown:
+            return
+        self.history_shown = records
+        if not records:
+            texts = ["No history"]
+        else:
+            texts = [format_record(record) for record in records]
+        texts += [""] * (HISTORY_ROWS - len(texts))
+        for i, text in enumerate(texts):
+            if len(text) > HISTORY_CHARS:
+                text = text[:HISTORY_CHARS - 1] + "…"
+            if text != self.history_texts[i]:
+                self.history_texts[i] = text
+                self.history_vars[i].set(text)
+
+    def on_history_scroll(self, event):
+        """Scrolls the history view one record per wheel step."""
+        older = event.num == 4 or getattr(event, "delta", 0) > 0
+        limit = max(len(self.logic.history) - HISTORY_ROWS, 0)
+        offset = min(self.history_offset + 1, limit) if older else max(self.history_offset - 1, 0)
+        if offset != self.history_offset:
+            self.history_offset = offset
+            self.history_dirty = True
+            self.schedule()
 
     def update_theme(self, colors):
         """Updates the display theme with specified colours."""
         self.main_display.configure(foreground=colors["fg"], background=colors["bg"])
-        self.history_label.configure(foreground=colors["fg"], background=colors["bg"])
+        self.preview_label.configure(foreground=colors["fg"], background=colors["bg"])
+        for label in self.history_labels:
+            label.configure(foreground=colors["fg"], background=colors["bg"])
         self.memory_label.configure(foreground=colors["fg"], background=colors["bg"])
-        self.mode_label.configure(foreground=colors["fg"], background=colors["bg"])
\ No newline at end of file
+        self.mode_label.configure(foreground=colors["fg"], background=colors["bg"])
@@ -0,0 +1,165 @@
+import argparse
+import os
+import re
+import sys
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from decimation import is_increasing, min_max_decimate
+
+##Rows written to CSV per chunk, bounding memory for any curve length
+CSV_CHUNK_ROWS = 65536
+##Arrays with more rows than this are written through a memory map instead of an in-memory copy
+MEMMAP_ROWS = 1 << 20
+
+def export_npy(path, curves):
+    """Writes the curves as one (rows, 3) float64 array of curve index, x and y.
+
+    Large arrays are filled through a memory map, so the combined array never
+    has to exist in memory; read it back with np.load(path, mmap_mode="r").
+    """
+    rows = sum(len(x) for _, x, _ in curves)
+    if rows > MEMMAP_ROWS:
+        data = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(rows, 3))
+    else:
+        data = np.empty((rows, 3))
+    start = 0
+    for i, (_, x, y) in enumerate(curves):
+        stop = start + len(x)
+        data[start:stop, 0] = i
+        data[start:stop, 1] = x
+        data[start:stop, 2] = y
+        start = stop
+    if isinstance(data, np.memmap):
+        data.flush()
+        del data
+    else:
+        ## Through a file object, since np.save appends .npy to a path that lacks it, e.g. out.NPY
+        with open(path, "wb") as f:
+            np.save(f, data)
+
+def export_npz(path, curves, compressed=False):
+    """Writes each curve as arrays x0, y0, x1, y1, ... plus a labels array."""
+    arrays = {"labels": np.array([label for label, _, _ in curves])}
+    for i, (_, x, y) in enumerate(curves):
+        arrays[f"x{i}"] = np.asarray(x, dtype=np.float64)
+        arrays[f"y{i}"] = np.asarray(y, dtype=np.float64)
+    with open(path, "wb") as f:
+        (np.savez_compressed if compressed else np.savez)(f, **arrays)
+
+def export_csv(path, curves, chunk_rows=CSV_CHUNK_ROWS):
+    """Streams the curves to CSV as function,x,y rows, chunk_rows at a time."""
+    with open(path, "w", newline="") as f:
+        f.write("function,x,y\n")
+        for label, x, y in curves:
+            row_format = '"' + label.replace('"', '""').replace("%", "%%") + '",%.17g,%.17g\n'
+            for start in range(0, len(x), chunk_rows):
+                chunk = np.column_stack((x[start:start + chunk_rows], y[start:start + chunk_rows]))
+                f.writelines(row_format % (x_value, y_value) for x_value, y_value in chunk.tolist())
+
+def save_figure(fig, path, fmt=None):
+    """Saves a figure with every line first decimated to its axes' pixel width.
+
+    SVG and PDF files then hold a few points per pixel column instead of
+    every sample, and raster formats render as fast; the min/max envelope
+    draws the same picture. Only lines whose x never decreases are reduced,
+    since the envelope of a parametric or polar curve is not its picture.
+    The lines get their full data back afterwards.
+    """
+    fmt = (fmt or os.path.splitext(path)[1][1:]).lower()
+    saved = []
+    try:
+        for ax in fig.axes:
+            columns = max(int(ax.bbox.width), 1)
+            for line in ax.lines:
+                x, y = line.get_data()
+                if not is_increasing(x):
+                    continue
+                saved.append((line, x, y))
+                line.set_data(*min_max_decimate(x, y, columns))
+        fig.savefig(path, format=fmt)
+    finally:
+        for line, x, y in saved:
+            line.set_data(x, y)
+
+def export_plot(path, fig, curves):
+    """Exports a plot by file extension: raw data for .npy/.npz/.csv, otherwise the figure."""
+    fmt = os.path.splitext(path)[1][1:].lower()
+    if fmt == "npy":
+        export_npy(path, curves)
+    elif fmt == "npz":
+        export_npz(path, curves)
+    elif fmt == "csv":
+        export_csv(path, curves)
+    else:
+        save_figure(fig, path, fmt)
+
+def file_stem(index, func_str):
+    """Returns a file name stem for the index-th expression of a batch."""
+    return f"{index:04d}_" + (re.sub(r"[^A-Za-z0-9]+", "_", func_str).strip("_")[:40] or "expression")
+
+def batch_export(func_strs, output_dir, formats=("png",), x_min=-10, x_max=10, num_points=1000, logic=None):
+    """Plots every expression on an off-screen Agg figure and writes it in each format.
+
+    Returns (expression, paths, error) per expression; an invalid expression
+    is reported and skipped.
+    """
+    from calculator import CalculatorLogic
+    logic = logic or CalculatorLogic()
+    os.makedirs(output_dir, exist_ok=True)
+    fig = Figure(figsize=(5, 4))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    results = []
+    for index, func_str in enumerate(func_strs):
+        try:
+            x_values, y_values = logic.graph_function(func_str, x_min, x_max, num_points)
+        except ValueError as e:
+            results.append((func_str, [], str(e)))
+            continue
+        ax.clear()
+        ax.plot(x_values, y_values, label=func_str)
+        ax.set_title("Graph of Functions")
+        ax.set_xlabel("x")
+        ax.set_ylabel("y")
+        ax.legend()
+        paths = []
+        for fmt in formats:
+            path = os.path.join(output_dir, f"{file_stem(index, func_str)}.{fmt}")
+            export_plot(path, fig, [(func_str, x_values, y_values)])
+            paths.append(path)
+        results.append((func_str, paths, ""))
+    return results
+
+def main(argv=None):
+    """Command-line entry point for exporting plots without opening a window."""
+    parser = argparse.ArgumentParser(description="Plot expressions to files without a display.")
+    parser.add_argument("input", nargs="?", help="file with one expression per line (default: stdin)")
+    parser.add_argument("--output-dir", "-o", default="exports", help="directory for the exported files")
+    parser.add_argument("--format", "-f", action="append", dest="formats",
+                        help="png, svg, pdf, npy, npz or csv; repeat for several (default: png)")
+    parser.add_argument("--x-min", type=float, default=-10)
+    parser.add_argument("--x-max", type=float, default=10)
+    parser.add_argument("--points", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    try:
+        stream = open(args.input) if args.input else sys.stdin
+    except OSError as e:
+        parser.error(f"cannot read {args.input}: {e.strerror}")
+    try:
+        func_strs = [line.strip() for line in stream if line.strip()]
+    finally:
+        if args.input:
+            stream.close()
+    failed = 0
+    for func_str, paths, error in batch_export(func_strs, args.output_dir, args.formats or ["png"], args.x_min, args.x_max, args.points):
+        if error:
+            failed += 1
+            print(f"{func_str}: {error}", file=sys.stderr)
+        else:
+            print("\n".join(paths))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
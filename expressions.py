@@ -0,0 +1,218 @@
+import ast
+import math
+import operator
+import threading
+from collections import OrderedDict
+import profiling
+from symbolic import ExpressionGraph, float_power, format_node, is_large_power, lower_graph
+
+##Functions and constants available to user-defined expressions
+SCALAR_FUNCTIONS = {
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'log': math.log10,
+    'ln': math.log,
+    'sqrt': math.sqrt,
+    'exp': math.exp,
+}
+##NumPy versions of SCALAR_FUNCTIONS, filled in by array_functions() so numpy loads on first use
+ARRAY_FUNCTIONS = {}
+CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+}
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+def array_functions():
+    """Returns the NumPy function table, importing numpy the first time."""
+    if not ARRAY_FUNCTIONS:
+        import numpy as np
+        ARRAY_FUNCTIONS.update({
+            'sin': np.sin,
+            'cos': np.cos,
+            'tan': np.tan,
+            'log': np.log10,
+            'ln': np.log,
+            'sqrt': np.sqrt,
+            'exp': np.exp,
+        })
+    return ARRAY_FUNCTIONS
+
+class CompiledExpression:
+    """A validated, simplified expression ready to be evaluated many times.
+
+    scalar and array are functions taking a dictionary of variable values;
+    array is bound to the NumPy ufuncs and is only built when first used.
+    Both evaluate every output node of the expression graph, sharing common
+    subexpressions, and return a tuple when there is more than one output.
+    """
+
+    def __init__(self, source, graph, outputs, names, variables):
+        self.source = source
+        self.graph = graph
+        self.outputs = outputs
+        self.names = names
+        self.variables = variables
+        self.scalar = lower_graph(outputs, SCALAR_FUNCTIONS)
+        self._array = None
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @property
+    def array(self):
+        if self._array is None:
+            self._array = lower_graph(self.outputs, array_functions())
+        return self._array
+
+    @property
+    def text(self):
+        """The simplified expression text of each output, joined by commas."""
+        return ", ".join(format_node(node) for node in self.outputs)
+
+    def derivative(self, variable="x"):
+        """Returns the derivative with respect to variable as a CompiledExpression."""
+        return self._derive(variable, False)
+
+    def with_derivative(self, variable="x"):
+        """Returns a CompiledExpression evaluating (f, df/dvariable) in a single pass."""
+        return self._derive(variable, True)
+
+    def _derive(self, variable, keep_value):
+        key = (variable, keep_value)
+        with self._lock:
+            if key not in self._derived:
+                derivative = tuple(self.graph.derivative(node, variable) for node in self.outputs)
+                outputs = self.outputs + derivative if keep_value else derivative
+                self._derived[key] = CompiledExpression(f"d/d{variable} {self.source}", self.graph, outputs, self.names, self.variables)
+            return self._derived[key]
+
+def normalize_expression(func_str):
+    """Returns the cache key for an expression: stripped, with whitespace runs collapsed."""
+    return " ".join(func_str.split())
+
+def compile_expression(source, variables=("x",)):
+    """Parses, validates and constant-folds source, then simplifies it into a CompiledExpression."""
+    try:
+        tree = ast.parse(source, mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(e.msg)
+    for name in variables:
+        if name in SCALAR_FUNCTIONS or name in CONSTANTS:
+            raise ValueError(f"variable name '{name}' shadows a built-in name")
+    names = set()
+    tree = _fold(tree, frozenset(variables), names)
+    graph = ExpressionGraph()
+    return CompiledExpression(source, graph, (graph.from_ast(tree),), frozenset(names), tuple(variables))
+
+def _fold(node, variables, names):
+    """Validates node against the whitelist and folds subtrees that do not depend on a variable."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"unsupported constant {node.value!r}")
+        return node
+    if isinstance(node, ast.Name):
+        names.add(node.id)
+        if node.id in variables:
+            return node
+        if node.id in CONSTANTS:
+            return ast.Constant(CONSTANTS[node.id])
+        raise ValueError(f"name '{node.id}' is not defined")
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in BINARY_OPERATORS:
+            raise ValueError(f"unsupported operator {type(node.op).__name__}")
+        node = ast.BinOp(_fold(node.left, variables, names), node.op, _fold(node.right, variables, names))
+        if _is_constant(node.left, node.right):
+            if isinstance(node.op, ast.Pow) and is_large_power(node.left.value, node.right.value):
+                return _try_fold(node, float_power, node.left.value, node.right.value)
+            return _try_fold(node, BINARY_OPERATORS[type(node.op)], node.left.value, node.right.value)
+        return node
+    if isinstance(node, ast.UnaryOp):
+        if type(node.op) not in UNARY_OPERATORS:
+            raise ValueError(f"unsupported operator {type(node.op).__name__}")
+        node = ast.UnaryOp(node.op, _fold(node.operand, variables, names))
+        if _is_constant(node.operand):
+            return _try_fold(node, UNARY_OPERATORS[type(node.op)], node.operand.value)
+        return node
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("only plain function calls are allowed")
+        if node.func.id not in SCALAR_FUNCTIONS:
+            raise ValueError(f"name '{node.func.id}' is not defined")
+        ## NumPy ufuncs take a positional out array, so sin(x, x) would overwrite x
+        if len(node.args) != 1:
+            raise ValueError(f"{node.func.id}() takes exactly one argument ({len(node.args)} given)")
+        names.add(node.func.id)
+        args = [_fold(arg, variables, names) for arg in node.args]
+        node = ast.Call(node.func, args, [])
+        if _is_constant(*args):
+            return _try_fold(node, SCALAR_FUNCTIONS[node.func.id], *(arg.value for arg in args))
+        return node
+    raise ValueError(f"unsupported syntax {type(node).__name__}")
+
+def _is_constant(*nodes):
+    return all(isinstance(node, ast.Constant) for node in nodes)
+
+def _try_fold(node, func, *args):
+    """Replaces node by its value, or keeps it if evaluating fails so the error surfaces at run time."""
+    try:
+        return ast.Constant(func(*args))
+    except (ArithmeticError, ValueError, TypeError):
+        return node
+
+class ExpressionCache:
+    """Bounded LRU cache of compiled and validated user expressions."""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, func_str, variables=("x",)):
+        """Returns the CompiledExpression for func_str, compiling it on a miss."""
+        key = (normalize_expression(func_str), tuple(variables))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                profiling.count("expressions.cache_hits")
+                return entry
+            self.misses += 1
+        profiling.count("expressions.cache_misses")
+        with profiling.span("expressions.compile"):
+            entry = compile_expression(key[0], key[1])
+        with self._lock:
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Empties the cache and resets the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Returns the cache statistics as a dictionary."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,216 @@
+import re
+from collections import OrderedDict, namedtuple
+import profiling
+
+Token = namedtuple("Token", ["kind", "text", "start", "end"])
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)j?)|(?P<name>[^\W\d]\w*)|(?P<op>\*\*|[-+*/^%!()√]))")
+
+##Binding power of each infix operator; ^ is right-associative
+INFIX_POWERS = {"+": 10, "-": 10, "*": 20, "/": 20, "mod": 20, "^": 40}
+##Prefix operators bind looser than ^, so -2^2 is -(2^2) and √9^2 is √(9^2)
+PREFIX_POWER = 30
+POSTFIX_POWER = 50
+##Spellings accepted for the keypad's operators and functions
+ALIASES = {"**": "^", "√": "sqrt", "pi": "π"}
+
+##Parenthesised groups whose parse is kept for reuse while the line is edited
+MAX_CACHED_GROUPS = 256
+##Interned nodes kept before the parser starts afresh
+MAX_NODES = 4096
+
+def tokenize(text):
+    """Splits a formula into tokens; raises ValueError at the first character that starts none."""
+    tokens = []
+    position = 0
+    end = len(text.rstrip())
+    while position < end:
+        match = TOKEN_PATTERN.match(text, position)
+        if match is None:
+            position += len(text[position:]) - len(text[position:].lstrip())
+            raise ValueError(f"unexpected '{text[position]}' at {position + 1}")
+        kind = match.lastgroup
+        tokens.append(Token(kind, match.group(kind), match.start(kind), match.end()))
+        position = match.end()
+    return tokens
+
+class FormulaNode:
+    """One interned node of a parsed formula.
+
+    op is "number" or "name" (args holds the token text), "neg", "pos",
+    "!", "%", an infix operator, or "call" (args holds the function name and
+    argument). Equal subtrees are the same node, so the value cached on a
+    node by evaluate() serves every formula that contains it.
+    """
+
+    __slots__ = ("op", "args", "mode", "value", "error")
+
+    def __init__(self, op, args):
+        self.op = op
+        self.args = args
+        self.mode = None
+        self.value = None
+        self.error = None
+
+class FormulaParser:
+    """Pratt parser for full-line keypad formulas that reuses unchanged parts of the line.
+
+    Nodes are hash-consed, and the node of every parenthesised group is
+    cached by the group's text, so after an edit only the groups containing
+    the edited token and the top level around them are parsed again; every
+    other group is taken from the cache whole. Tokenizing the line is a
+    single regular expression scan.
+    """
+
+    def __init__(self, functions, constants, max_groups=MAX_CACHED_GROUPS, max_nodes=MAX_NODES):
+        self.functions = frozenset(functions)
+        self.constants = frozenset(constants)
+        self.max_groups = max_groups
+        self.max_nodes = max_nodes
+        self._nodes = {}
+        self._groups = OrderedDict()
+
+    def parse(self, text):
+        """Returns the root node of text; raises ValueError for an incomplete or invalid formula."""
+        if len(self._nodes) > self.max_nodes:
+            self._nodes.clear()
+            self._groups.clear()
+        self._text = text
+        self._tokens = tokenize(text)
+        if not self._tokens:
+            raise ValueError("empty formula")
+        self._closing = self._match_parentheses(self._tokens)
+        self._position = 0
+        node = self._expression(0)
+        if self._position < len(self._tokens):
+            raise self._unexpected(self._tokens[self._position])
+        return node
+
+    def _match_parentheses(self, tokens):
+        """Returns {index of "(": index of its ")"} for the balanced pairs."""
+        closing = {}
+        stack = []
+        for i, token in enumerate(tokens):
+            if token.text == "(":
+                stack.append(i)
+            elif token.text == ")" and stack:
+                closing[stack.pop()] = i
+        return closing
+
+    def _node(self, op, *args):
+        key = (op, *args)
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = FormulaNode(op, args)
+        return node
+
+    def _next(self):
+        if self._position >= len(self._tokens):
+            raise ValueError("incomplete formula")
+        token = self._tokens[self._position]
+        self._position += 1
+        return token
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _unexpected(self, token):
+        return ValueError(f"unexpected '{token.text}' at {token.start + 1}")
+
+    def _expression(self, right_power):
+        left = self._prefix(self._next())
+        while True:
+            token = self._peek()
+            if token is None:
+                return left
+            op = ALIASES.get(token.text, token.text)
+            if op in ("!", "%") and POSTFIX_POWER > right_power:
+                self._position += 1
+                left = self._node(op, left)
+            elif op in INFIX_POWERS and INFIX_POWERS[op] > right_power:
+                self._position += 1
+                power = INFIX_POWERS[op]
+                left = self._node(op, left, self._expression(power - 1 if op == "^" else power))
+            else:
+                return left
+
+    def _prefix(self, token):
+        text = ALIASES.get(token.text, token.text)
+        if token.kind == "number":
+            return self._node("number", token.text)
+        if text in ("-", "+"):
+            return self._node("neg" if text == "-" else "pos", self._expression(PREFIX_POWER))
+        if text == "(":
+            return self._group(self._position - 1)
+        if text in self.functions:
+            if token.text == "√" and (self._peek() is None or self._peek().text != "("):
+                return self._node("call", text, self._expression(PREFIX_POWER))
+            following = self._next()
+            if following.text != "(":
+                raise ValueError(f"{token.text} needs parentheses at {following.start + 1}")
+            return self._node("call", text, self._group(self._position - 1))
+        if token.kind == "name" and text in self.constants:
+            return self._node("name", text)
+        if token.kind == "name":
+            raise ValueError(f"unknown name '{token.text}'")
+        raise self._unexpected(token)
+
+    def _group(self, opening):
+        """Parses the group opened at token index opening, or takes it from the cache."""
+        closing = self._closing.get(opening)
+        if closing is None:
+            raise ValueError("incomplete formula: missing )")
+        key = self._text[self._tokens[opening].start:self._tokens[closing].end]
+        node = self._groups.get(key)
+        if node is not None:
+            self._groups.move_to_end(key)
+            profiling.count("formula.group_hits")
+            self._position = closing + 1
+            return node
+        profiling.count("formula.group_misses")
+        self._position = opening + 1
+        node = self._expression(0)
+        if self._position != closing:
+            raise self._unexpected(self._tokens[self._position])
+        self._position = closing + 1
+        self._groups[key] = node
+        if len(self._groups) > self.max_groups:
+            self._groups.popitem(last=False)
+        return node
+
+def evaluate(node, logic):
+    """Returns the value of a parsed formula with the calculator's number, angle and precision semantics.
+
+    Each node keeps its value for the current modes, so re-evaluating after
+    an edit only computes the nodes the edit created.
+    """
+    mode = logic.mode_key()
+    if node.mode == mode:
+        if node.error is not None:
+            raise ValueError(node.error)
+        return node.value
+    try:
+        value = _compute(node, logic)
+    except Exception as e:
+        node.mode, node.value, node.error = mode, None, str(e) or type(e).__name__
+        raise ValueError(node.error)
+    node.mode, node.value, node.error = mode, value, None
+    return value
+
+def _compute(node, logic):
+    op, args = node.op, node.args
+    if op == "number":
+        return logic.parse_number(args[0])
+    if op == "name":
+        return logic.constant_value(args[0])
+    if op == "call":
+        return logic.scientific_value(args[0], evaluate(args[1], logic))
+    if op == "neg":
+        return -evaluate(args[0], logic)
+    if op == "pos":
+        return evaluate(args[0], logic)
+    if op == "!":
+        return logic.factorial_value(evaluate(args[0], logic))
+    if op == "%":
+        return logic.as_real(evaluate(args[0], logic)) / 100
+    return logic.binary_operation(op, evaluate(args[0], logic), evaluate(args[1], logic))
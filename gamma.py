@@ -0,0 +1,111 @@
+import math
+from decimal import Decimal, Context, MAX_EMAX, MAX_PREC, MIN_EMIN, localcontext
+
+##Integer n! up to this n is returned exactly (from the memo table); larger n is approximated
+EXACT_LIMIT = 1000
+##Largest n whose exact digits can be requested; 25000! has about 100 000 digits, which a Tk Text still shows quickly
+EXACT_DIGITS_LIMIT = 25000
+##Significant digits of the approximate results
+APPROX_DIGITS = 16
+##Below this argument Stirling's series is not accurate enough and math.lgamma is used
+STIRLING_MIN = 20
+
+_table = [1]
+_executor = None
+
+def exact_factorial(n):
+    """Returns n! for 0 <= n <= EXACT_LIMIT, extending the memo table as needed."""
+    for k in range(len(_table), n + 1):
+        _table.append(_table[-1] * k)
+    return _table[n]
+
+def factorial(x):
+    """Returns x! = gamma(x + 1).
+
+    Integers up to EXACT_LIMIT give an exact int, other arguments a float
+    from math.gamma, and results too large for either a Decimal with
+    APPROX_DIGITS significant digits from log-gamma (Stirling's series),
+    which costs the same for any size of x.
+    """
+    if x == int(x):
+        n = int(x)
+        if n < 0:
+            raise ValueError("factorial is not defined for negative integers")
+        if n <= EXACT_LIMIT:
+            return exact_factorial(n)
+        return approximate_factorial(n)
+    try:
+        return math.gamma(x + 1)
+    except OverflowError:
+        return approximate_factorial(x)
+
+def approximate_factorial(x):
+    """Returns x! for large positive x as a Decimal in scientific notation.
+
+    The calculator carries such values as Decimals in float mode as well,
+    since they are beyond the range of a float.
+    """
+    digits = len(str(int(x))) + APPROX_DIGITS + 5
+    with localcontext(Context(prec=digits, Emax=MAX_EMAX, Emin=MIN_EMIN)) as ctx:
+        log10 = log_gamma(Decimal(x) + 1) / Decimal(10).ln()
+        exponent = int(log10.to_integral_value(rounding="ROUND_FLOOR"))
+        ctx.prec = APPROX_DIGITS + 5
+        mantissa = (Decimal(10) ** (log10 - exponent)).quantize(Decimal(1).scaleb(1 - APPROX_DIGITS))
+        return mantissa.scaleb(exponent)
+
+def log_gamma(z):
+    """Returns ln(gamma(z)) for a Decimal z > 0 at the active context's precision."""
+    if z < STIRLING_MIN:
+        return Decimal(math.lgamma(float(z)))
+    ## Stirling's series: (z - 1/2) ln z - z + ln(2 pi)/2 + sum B2k / (2k (2k - 1) z^(2k - 1))
+    pi = Decimal(math.pi) if z < 10 ** 6 else _pi()
+    total = (z - Decimal("0.5")) * z.ln() - z + (2 * pi).ln() / 2
+    coefficients = (Decimal(1) / 12, Decimal(-1) / 360, Decimal(1) / 1260, Decimal(-1) / 1680, Decimal(1) / 1188)
+    power = z
+    for k, coefficient in enumerate(coefficients):
+        total += coefficient / power
+        power *= z * z
+    return total
+
+def _pi():
+    """Returns pi at the active context's precision."""
+    with localcontext() as ctx:
+        ctx.prec += 5
+        return 4 * (4 * _atan_inverse(5) - _atan_inverse(239))
+
+def _atan_inverse(n):
+    total, term, k, n_squared = Decimal(0), Decimal(1) / n, 1, n * n
+    while True:
+        new_total = total + term / k if k % 4 == 1 else total - term / k
+        if new_total == total:
+            return total
+        total = new_total
+        term /= n_squared
+        k += 2
+
+def exact_digits(n):
+    """Returns the decimal digits of n!, computed by binary splitting in exact Decimal arithmetic."""
+    with localcontext(Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)):
+        return str(_product(1, n)) if n > 1 else "1"
+
+def _product(low, high):
+    if high - low < 16:
+        result = Decimal(low)
+        for k in range(low + 1, high + 1):
+            result *= k
+        return result
+    middle = (low + high) // 2
+    return _product(low, middle) * _product(middle + 1, high)
+
+def submit_exact_digits(n):
+    """Computes exact_digits(n) in a worker process and returns a Future.
+
+    The worker is spawned rather than forked, since the Tk process may have
+    plot threads running; multiprocessing is only imported on first use.
+    """
+    global _executor
+    if _executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _executor.submit(exact_digits, n)
@@ -1,8 +1,67 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
 import matplotlib.pyplot as plt
+from matplotlib import colormaps
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from expressions import normalize_expression
+from tiles import TileCache
+from decimation import decimate_range
+import export
+import sweeps
+import profiling
+
+##How often the Tk loop checks for finished plot jobs, in milliseconds
+POLL_INTERVAL_MS = 30
+##Factor applied to the view per scroll step when zooming
+ZOOM_STEP = 1.25
+##Plot types; for contour and heatmap Function 1 is f(x, y) and Points is the grid size per axis
+PLOT_MODES = ("y = f(x)", "parametric", "polar", "contour", "heatmap")
+FIELD_MODES = ("contour", "heatmap")
+CONTOUR_LEVELS = 20
+##Rows the function list can grow to
+MAX_FUNCTIONS = 20
+##Lines beyond which the legend is left out, e.g. for a sweep
+MAX_LEGEND_ENTRIES = 10
+##Colour map spread over the curves of a parameter sweep
+SWEEP_COLORMAP = "viridis"
+##Save dialog choices; the data formats hold every sampled point of the plotted lines
+SAVE_FILETYPES = [
+    ("PNG files", "*.png"), ("SVG files", "*.svg"), ("PDF files", "*.pdf"),
+    ("NumPy array", "*.npy"), ("NumPy archive", "*.npz"), ("CSV files", "*.csv"), ("All files", "*.*"),
+]
+DATA_EXTENSIONS = (".npy", ".npz", ".csv")
+
+class SelectedResult:
+    """Future-like view of some items of a shared future's tuple result, e.g. (x, dy) of (x, y, dy)."""
+
+    def __init__(self, future, indices):
+        self.future = future
+        self.indices = indices
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        return self.future.cancel()
+
+    def result(self):
+        result = self.future.result()
+        return tuple(result[i] for i in self.indices)
+
+class SweepCurve(SelectedResult):
+    """Future-like view of one curve, (x, y), of a sweep future's (x, rows, seconds) result."""
+
+    def __init__(self, future, index):
+        super().__init__(future, (index,))
+
+    def result(self):
+        x_values, rows, _ = self.future.result()
+        return x_values, rows[self.indices[0]]
 
 class GraphingFrame(tk.Frame):
     def __init__(self, parent, logic, theme, themes):
@@ -15,35 +74,59 @@ class GraphingFrame(tk.Frame):
 
         self.color_options = ["blue", "red", "green", "orange", "purple", "black"]
 
-        ## Function 1
-        tk.Label(self, text="Function 1:", bg=self.colors["bg"], fg=self.colors["fg"]).grid(row=0, column=0, padx=5, pady=5)
-        self.func1_entry = tk.Entry(self, width=30)
-        self.func1_entry.grid(row=0, column=1, padx=5, pady=5)
-        self.color1_var = tk.StringVar(value="blue")
-        ttk.Combobox(self, textvariable=self.color1_var, values=self.color_options).grid(row=0, column=2, padx=5, pady=5)
-
-        ## Function 2
-        tk.Label(self, text="Function 2:", bg=self.colors["bg"], fg=self.colors["fg"]).grid(row=1, column=0, padx=5, pady=5)
-        self.func2_entry = tk.Entry(self, width=30)
-        self.func2_entry.grid(row=1, column=1, padx=5, pady=5)
-        self.color2_var = tk.StringVar(value="red")
-        ttk.Combobox(self, textvariable=self.color2_var, values=self.color_options).grid(row=1, column=2, padx=5, pady=5)
+        ## Function list: Functions 1 and 2 are always there, more can be added.
+        ## A sweep such as k = 1:50 turns every function using k into one curve per value.
+        self.functions_frame = tk.Frame(self, bg=self.colors["bg"])
+        self.functions_frame.grid(row=0, column=0, rowspan=2, columnspan=3)
+        self.function_rows = []
+        self.add_function_row("blue")
+        self.add_function_row("red")
+        self.func1_entry, self.color1_var = self.function_rows[0][1:3]
+        self.func2_entry, self.color2_var = self.function_rows[1][1:3]
+        sweep_frame = tk.Frame(self.functions_frame, bg=self.colors["bg"])
+        sweep_frame.grid(row=MAX_FUNCTIONS, column=0, columnspan=4, pady=5)
+        self.add_function_button = tk.Button(sweep_frame, text="Add Function", command=self.add_function_row, bg=self.colors["button_bg"], fg=self.colors["button_fg"])
+        self.add_function_button.pack(side=tk.LEFT, padx=5)
+        tk.Label(sweep_frame, text="Sweep:", bg=self.colors["bg"], fg=self.colors["fg"]).pack(side=tk.LEFT)
+        self.sweep_entry = tk.Entry(sweep_frame, width=20)
+        self.sweep_entry.pack(side=tk.LEFT, padx=5)
 
         ## X-range entries
         tk.Label(self, text="X-min:", bg=self.colors["bg"], fg=self.colors["fg"]).grid(row=2, column=0, padx=5, pady=5)
         self.xmin_entry = tk.Entry(self, width=10)
         self.xmin_entry.insert(0, "-10")
         self.xmin_entry.grid(row=2, column=1, padx=5, pady=5)
+        ymin_frame = tk.Frame(self, bg=self.colors["bg"])
+        ymin_frame.grid(row=2, column=2, padx=5, pady=5)
+        tk.Label(ymin_frame, text="Y-min:", bg=self.colors["bg"], fg=self.colors["fg"]).pack(side=tk.LEFT)
+        self.ymin_entry = tk.Entry(ymin_frame, width=10)
+        self.ymin_entry.insert(0, "-10")
+        self.ymin_entry.pack(side=tk.LEFT)
 
         tk.Label(self, text="X-max:", bg=self.colors["bg"], fg=self.colors["fg"]).grid(row=3, column=0, padx=5, pady=5)
         self.xmax_entry = tk.Entry(self, width=10)
         self.xmax_entry.insert(0, "10")
         self.xmax_entry.grid(row=3, column=1, padx=5, pady=5)
+        ymax_frame = tk.Frame(self, bg=self.colors["bg"])
+        ymax_frame.grid(row=3, column=2, padx=5, pady=5)
+        tk.Label(ymax_frame, text="Y-max:", bg=self.colors["bg"], fg=self.colors["fg"]).pack(side=tk.LEFT)
+        self.ymax_entry = tk.Entry(ymax_frame, width=10)
+        self.ymax_entry.insert(0, "10")
+        self.ymax_entry.pack(side=tk.LEFT)
 
         tk.Label(self, text="Points:", bg=self.colors["bg"], fg=self.colors["fg"]).grid(row=4, column=0, padx=5, pady=5)
         self.points_entry = tk.Entry(self, width=10)
         self.points_entry.insert(0, "400")
         self.points_entry.grid(row=4, column=1, padx=5, pady=5)
+        options_frame = tk.Frame(self, bg=self.colors["bg"])
+        options_frame.grid(row=4, column=2, padx=5, pady=5)
+        self.adaptive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_frame, text="Adaptive", variable=self.adaptive_var, bg=self.colors["bg"], fg=self.colors["fg"], selectcolor=self.colors["button_bg"]).pack(side=tk.LEFT)
+        self.mode_var = tk.StringVar(value=PLOT_MODES[0])
+        ttk.Combobox(options_frame, textvariable=self.mode_var, values=PLOT_MODES, state="readonly", width=10).pack(side=tk.LEFT)
+        ## Plots the derivative of Function 1 in the second slot, evaluated in the same pass
+        self.derivative_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(options_frame, text="f1'", variable=self.derivative_var, bg=self.colors["bg"], fg=self.colors["fg"], selectcolor=self.colors["button_bg"]).pack(side=tk.LEFT)
 
         ## Buttons
         plot_button = tk.Button(self, text="Plot", command=self.plot_function, bg=self.colors["button_bg"], fg=self.colors["button_fg"])
@@ -55,53 +138,604 @@ class GraphingFrame(tk.Frame):
         save_button = tk.Button(self, text="Save Plot", command=self.save_plot, bg=self.colors["button_bg"], fg=self.colors["button_fg"])
         save_button.grid(row=5, column=2, pady=10)
 
+        ## Roots, extrema and the integral of the y = f(x) lines over the X range
+        analyze_button = tk.Button(self, text="Analyze", command=self.analyze_plot, bg=self.colors["button_bg"], fg=self.colors["button_fg"])
+        analyze_button.grid(row=8, column=0, pady=5)
+        self.analysis_label = tk.Label(self, text="", justify=tk.LEFT, bg=self.colors["bg"], fg=self.colors["fg"])
+        self.analysis_label.grid(row=8, column=1, columnspan=2, sticky="w", padx=5, pady=5)
+        self.markers = []
+
         ## Matplotlib figure
         self.fig, self.ax = plt.subplots(figsize=(5, 4))
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas.get_tk_widget().grid(row=6, column=0, columnspan=3, padx=5, pady=5)
+        self.ax.set_title("Graph of Functions")
+        self.ax.set_xlabel("x")
+        self.ax.set_ylabel("y")
+
+        ## Persistent line per function slot, redrawn by blitting over a cached background.
+        ## A y = f(x) line only holds the min/max envelope of its samples at the canvas
+        ## width; full_data keeps every sample of each slot for export.
+        self.lines = {}
+        self.full_data = {}
+        self.line_keys = {}
+        self.line_mode = None
+        ## Contour or heatmap of f(x, y), drawn in place of the lines
+        self.field = None
+        self.colorbar = None
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("resize_event", self.on_resize)
+
+        ## Background evaluation, one worker per function slot
+        self.progress = ttk.Progressbar(self, mode="indeterminate")
+        self.progress.grid(row=7, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
+        self.progress.grid_remove()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="plot")
+        ## Worker processes for sweeps too large for one pass, started on first need
+        self.sweep_pool = None
+        self.sweep_pool_lock = threading.Lock()
+        self.plot_job = 0
+        self.pending = []
+        self.requested = []
+        self.plot_started = None
+        self.bind("<Destroy>", self.on_destroy)
+
+        ## Interactive pan (drag) and zoom (scroll), resampled from cached tiles
+        self.tile_cache = TileCache(self.logic.evaluate_function_array)
+        self.tile_jobs = {}
+        ## Tiles whose evaluation raised; they are not queued again while their expression is plotted
+        self.failed_tiles = set()
+        self.polling_tiles = False
+        self.drag_start = None
+        self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self.canvas.mpl_connect("button_press_event", self.on_press)
+        self.canvas.mpl_connect("motion_notify_event", self.on_motion)
+        self.canvas.mpl_connect("button_release_event", self.on_release)
+
+    def add_function_row(self, color=None):
+        """Adds a function entry with its colour choice; rows after the first two can be removed."""
+        index = len(self.function_rows)
+        if index >= MAX_FUNCTIONS:
+            messagebox.showinfo("Info", f"At most {MAX_FUNCTIONS} functions can be plotted.")
+            return
+        label = tk.Label(self.functions_frame, text=f"Function {index + 1}:", bg=self.colors["bg"], fg=self.colors["fg"])
+        entry = tk.Entry(self.functions_frame, width=30)
+        color_var = tk.StringVar(value=color or self.color_options[index % len(self.color_options)])
+        combobox = ttk.Combobox(self.functions_frame, textvariable=color_var, values=self.color_options)
+        row = [label, entry, color_var, combobox]
+        if index >= 2:
+            row.append(tk.Button(self.functions_frame, text="-", command=lambda: self.remove_function_row(row), bg=self.colors["button_bg"], fg=self.colors["button_fg"]))
+        self.function_rows.append(row)
+        self.grid_function_row(index)
+
+    def grid_function_row(self, index):
+        label, entry, _, combobox, *remove = self.function_rows[index]
+        label.config(text=f"Function {index + 1}:")
+        label.grid(row=index, column=0, padx=5, pady=5)
+        entry.grid(row=index, column=1, padx=5, pady=5)
+        combobox.grid(row=index, column=2, padx=5, pady=5)
+        for button in remove:
+            button.grid(row=index, column=3, padx=5, pady=5)
+
+    def remove_function_row(self, row):
+        """Removes an added function entry; the rows below move up."""
+        index = self.function_rows.index(row)
+        del self.function_rows[index]
+        for widget in row:
+            if isinstance(widget, tk.Widget):
+                widget.destroy()
+        for i in range(index, len(self.function_rows)):
+            self.grid_function_row(i)
 
     def plot_function(self):
-        """Plots the user-defined functions."""
+        """Starts evaluating the user-defined functions in the background."""
+        self.plot_started = time.perf_counter()
+        mode = self.mode_var.get()
         try:
             x_min = float(self.xmin_entry.get())
             x_max = float(self.xmax_entry.get())
             num_points = int(self.points_entry.get())
-            self.ax.clear()
+            if mode in FIELD_MODES:
+                y_min = float(self.ymin_entry.get())
+                y_max = float(self.ymax_entry.get())
+            sweep_text = self.sweep_entry.get().strip()
+            sweep = sweeps.parse_sweep(sweep_text) if sweep_text else None
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+
+        functions = [(entry.get(), color_var.get()) for _, entry, color_var, *_ in self.function_rows]
+        if not any(func_str.strip() for func_str, _ in functions):
+            messagebox.showinfo("Info", "Please enter at least one function to plot.")
+            return
+        if sweep is not None and (mode != "y = f(x)" or self.derivative_var.get()):
+            messagebox.showinfo("Info", "Parameter sweeps apply to y = f(x) plots without f1'.")
+            return
+
+        ## A new press supersedes any job still running
+        self.cancel_pending()
+        self.plot_job += 1
+        if mode in FIELD_MODES:
+            func_str = functions[0][0]
+            if not func_str.strip():
+                messagebox.showinfo("Info", "Please enter f(x, y) as Function 1.")
+                return
+            future = self.executor.submit(self.logic.graph_surface, func_str, x_min, x_max, y_min, y_max, num_points)
+            self.requested = [(mode, func_str, future)]
+            self.start_progress()
+            self.poll_plot(self.plot_job, self.update_field)
+            return
+
+        if mode == "y = f(x)" and self.derivative_var.get():
+            self.plot_with_derivative(functions, x_min, x_max, num_points)
+            return
+
+        ## Sweeps are sampled uniformly, so a sweep turns adaptive sampling off for every row
+        if mode == "y = f(x)" and self.adaptive_var.get() and sweep is None:
+            pixels = (int(self.ax.bbox.width), int(self.ax.bbox.height))
+            settings = ("adaptive", x_min, x_max, pixels)
+            evaluate = lambda func_str: self.logic.graph_function_adaptive(func_str, x_min, x_max, *pixels)
+        elif mode == "polar":
+            settings = ("uniform", x_min, x_max, num_points)
+            evaluate = lambda func_str: self.logic.graph_polar(func_str, x_min, x_max, num_points)
+        else:
+            settings = ("uniform", x_min, x_max, num_points)
+            evaluate = lambda func_str: self.logic.graph_function(func_str, x_min, x_max, num_points)
+
+        ## Each curve is (label, color, normalized expression, evaluation, (sweep row, value index) or None)
+        if mode == "parametric":
+            (x_str, color), (y_str, _) = functions[:2]
+            if not (x_str.strip() and y_str.strip()):
+                messagebox.showinfo("Info", "Please enter x(t) as Function 1 and y(t) as Function 2.")
+                return
+            curves = [
+                (f"({x_str}, {y_str})", color, (normalize_expression(x_str), normalize_expression(y_str)),
+                 partial(self.logic.graph_parametric, x_str, y_str, x_min, x_max, num_points), None)
+            ] + [("", None, None, None, None)] * (len(functions) - 1)
+        else:
+            curves = []
+            for row, (func_str, color) in enumerate(functions):
+                if sweep is None or not sweeps.uses_parameter(func_str, sweep[0]):
+                    curves.append((func_str, color, normalize_expression(func_str) if func_str.strip() else None, partial(evaluate, func_str), None))
+                    continue
+                ## Labelled with the substituted expression, so pan, zoom and analysis can evaluate each curve alone
+                name, values = sweep
+                colors = colormaps[SWEEP_COLORMAP](np.linspace(0, 1, len(values)))
+                evaluate_sweep = partial(self.evaluate_sweep, func_str, name, values, x_min, x_max, num_points)
+                for i, value in enumerate(values):
+                    label = sweeps.substitute(func_str, name, value)
+                    curves.append((label, tuple(colors[i]), normalize_expression(label), evaluate_sweep, (row, i)))
+
+        ## Only slots whose expression or sampling changed are re-evaluated; a sweep row is one
+        ## evaluation shared by its curves
+        self.requested = []
+        sweep_futures = {}
+        for slot, (label, color, expression, evaluate, part) in enumerate(curves):
+            key = (mode, expression, settings) if expression is not None else None
+            future = None
+            if key is not None and self.line_keys.get(slot) != key:
+                if part is None:
+                    future = self.executor.submit(evaluate)
+                else:
+                    row, index = part
+                    if row not in sweep_futures:
+                        sweep_futures[row] = self.executor.submit(evaluate)
+                    future = SweepCurve(sweep_futures[row], index)
+            self.requested.append((slot, label, color, key, future))
+        ## Slots beyond the curves, e.g. left over from a larger sweep, are removed
+        self.requested.extend((slot, "", None, None, None) for slot in self.lines if slot >= len(curves))
+        self.line_mode = mode
+        if any(future is not None for *_, future in self.requested):
+            self.start_progress()
+        apply = partial(self.update_sweep, list(sweep_futures.values())) if sweep_futures else self.update_lines
+        self.poll_plot(self.plot_job, apply)
+
+    def plot_with_derivative(self, functions, x_min, x_max, num_points):
+        """Plots Function 1 and its generated derivative from a single evaluation pass."""
+        (func_str, color), (_, derivative_color) = functions[:2]
+        if not func_str.strip():
+            messagebox.showinfo("Info", "Please enter Function 1 to plot its derivative.")
+            return
+        try:
+            derivative_str = self.logic.derivative_expression(func_str)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        expression = normalize_expression(func_str)
+        settings = ("uniform", x_min, x_max, num_points)
+        keys = [("y = f(x)", expression, settings), ("derivative", expression, settings)]
+        futures = [None, None]
+        if any(self.line_keys.get(slot) != key for slot, key in enumerate(keys)):
+            future = self.executor.submit(self.logic.graph_derivative, func_str, x_min, x_max, num_points)
+            futures = [SelectedResult(future, (0, 1)), SelectedResult(future, (0, 2))]
+        ## The derivative line is labelled with its own expression, so pan and zoom can resample it
+        self.requested = [
+            (0, func_str, color, keys[0], futures[0]),
+            (1, derivative_str, derivative_color, keys[1], futures[1]),
+        ] + [(slot, "", None, None, None) for slot in self.lines if slot >= 2]
+        self.line_mode = "y = f(x)"
+        if futures[0] is not None:
+            self.start_progress()
+        self.poll_plot(self.plot_job, self.update_lines)
+
+    def evaluate_sweep(self, func_str, parameter, values, x_min, x_max, num_points):
+        """Evaluates every curve of a sweep row and returns (x, rows, seconds); runs on a plot worker."""
+        pool = None
+        if sweeps.pass_count(len(values), num_points) > 1:
+            pool = self.get_sweep_pool()
+        start = time.perf_counter()
+        x_values, rows = self.logic.graph_sweep(func_str, parameter, values, x_min, x_max, num_points, pool)
+        return x_values, rows, time.perf_counter() - start
+
+    def get_sweep_pool(self):
+        """Returns the process pool for large sweeps, starting it on first use."""
+        with self.sweep_pool_lock:
+            if self.sweep_pool is None:
+                self.sweep_pool = sweeps.make_pool()
+            return self.sweep_pool
+
+    def update_sweep(self, futures, updates):
+        """Applies a plot that includes sweeps and reports their evaluation throughput."""
+        self.update_lines(updates)
+        results = [future.result() for future in futures]
+        samples = sum(rows.size for _, rows, _ in results)
+        seconds = sum(elapsed for *_, elapsed in results)
+        rate = samples / seconds if seconds > 0 else float("inf")
+        profiling.count("graphing.sweep_samples", samples)
+        self.analysis_label.config(text=f"Sweep: {sum(len(rows) for _, rows, _ in results)} curves, {samples:,} samples in {seconds:.3f} s ({rate:,.0f} samples/s)")
 
-            functions = [
-                (self.func1_entry.get(), self.color1_var.get()),
-                (self.func2_entry.get(), self.color2_var.get())
+    def start_progress(self):
+        """Shows the progress indicator for the futures of the requested plot."""
+        self.pending = [future for *_, future in self.requested if future is not None]
+        self.progress.grid()
+        self.progress.start()
+
+    def poll_plot(self, job, apply):
+        """Passes the results of a plot job to apply once all of its evaluations are done."""
+        if job != self.plot_job:
+            return
+        if not all(future.done() for future in self.pending):
+            self.after(POLL_INTERVAL_MS, self.poll_plot, job, apply)
+            return
+        self.pending = []
+        self.progress.stop()
+        self.progress.grid_remove()
+        ## Time from the button press until every result is ready, then until it is on screen
+        profiling.record("graphing.evaluate", self.plot_started)
+        requested, self.requested = self.requested, []
+        try:
+            updates = [
+                (*request, future.result() if future is not None else None)
+                for *request, future in requested
             ]
+        except Exception as e:
+            ## Any failure in a worker, not only a bad expression, is reported the same way
+            messagebox.showerror("Error", str(e) or type(e).__name__)
+            return
+        apply(updates)
+        profiling.record("graphing.plot_function", self.plot_started)
+
+    def update_lines(self, updates):
+        """Applies new data, colours and labels to the slot lines and redraws as little as possible."""
+        if self.field is not None:
+            self.remove_field()
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        data_changed = False
+        for slot, func_str, color, key, data in updates:
+            if data is not None or (key is None and slot in self.lines):
+                self.remove_markers()
+            line = self.lines.get(slot)
+            if key is None:
+                if line is not None:
+                    line.remove()
+                    del self.lines[slot]
+                    del self.line_keys[slot]
+                    del self.full_data[slot]
+                    data_changed = True
+                continue
+            if data is not None:
+                self.full_data[slot] = data
+                ## The envelope keeps the extremes, so autoscaling to it fits the full data
+                data = self.display_data(slot)
+                if line is None:
+                    line, = self.ax.plot(*data, animated=True)
+                    self.lines[slot] = line
+                else:
+                    line.set_data(*data)
+                self.line_keys[slot] = key
+                data_changed = True
+            line.set_color(color)
+            line.set_label(func_str)
 
-            plotted = False
-            for func_str, color in functions:
-                if func_str.strip():
-                    x_values, y_values = self.logic.graph_function(func_str, x_min, x_max, num_points)
-                    self.ax.plot(x_values, y_values, label=func_str, color=color)
-                    plotted = True
-
-            if plotted:
-                self.ax.set_title("Graph of Functions")
-                self.ax.set_xlabel("x")
-                self.ax.set_ylabel("y")
-                self.ax.legend()
+        if self.lines and len(self.lines) <= MAX_LEGEND_ENTRIES:
+            self.ax.legend().set_animated(True)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        if data_changed:
+            self.ax.set_autoscale_on(True)
+            self.ax.relim()
+            self.ax.autoscale_view()
+        ## Ticks and labels only need re-rendering when the axis limits move
+        if self.background is None or (self.ax.get_xlim(), self.ax.get_ylim()) != limits:
+            with profiling.span("graphing.canvas_draw"):
                 self.canvas.draw()
-            else:
-                messagebox.showinfo("Info", "Please enter at least one function to plot.")
+        else:
+            self.blit()
+
+    def update_field(self, updates):
+        """Draws a contour or heatmap of f(x, y) in place of the slot lines."""
+        (mode, func_str, (x_values, y_values, z_values)), = updates
+        if not np.isfinite(z_values).any():
+            messagebox.showerror("Error", "The function is undefined over the whole range.")
+            return
+        self.remove_lines()
+        if self.field is not None:
+            self.remove_field()
+        if mode == "contour":
+            self.field = self.ax.contourf(x_values, y_values, z_values, levels=CONTOUR_LEVELS)
+        else:
+            extent = (x_values[0], x_values[-1], y_values[0], y_values[-1])
+            self.field = self.ax.imshow(z_values, extent=extent, origin="lower", aspect="auto", interpolation="nearest")
+        self.colorbar = self.fig.colorbar(self.field, ax=self.ax)
+        self.colorbar.set_label(func_str)
+        self.ax.set_xlim(x_values[0], x_values[-1])
+        self.ax.set_ylim(y_values[0], y_values[-1])
+        with profiling.span("graphing.canvas_draw"):
+            self.canvas.draw()
+
+    def remove_field(self):
+        """Removes the contour or heatmap and its colour bar."""
+        self.colorbar.remove()
+        self.field.remove()
+        self.field = None
+        self.colorbar = None
+        ## The cached background still shows the field
+        self.background = None
+
+    def analyze_plot(self):
+        """Starts finding the roots, extrema and integrals of the plotted y = f(x) lines."""
+        if not self.lines or self.line_mode != "y = f(x)":
+            messagebox.showinfo("Info", "Please plot at least one y = f(x) function to analyze.")
+            return
+        try:
+            x_min = float(self.xmin_entry.get())
+            x_max = float(self.xmax_entry.get())
         except ValueError as e:
             messagebox.showerror("Error", str(e))
+            return
+        self.cancel_pending()
+        self.plot_job += 1
+        self.plot_started = time.perf_counter()
+        self.requested = [
+            (slot, line.get_label(), line.get_color(), self.executor.submit(self.analyze_line, line.get_label(), x_min, x_max))
+            for slot, line in sorted(self.lines.items())
+        ]
+        self.start_progress()
+        self.poll_plot(self.plot_job, self.show_analysis)
+
+    def analyze_line(self, func_str, x_min, x_max):
+        """Returns (roots, minima, maxima, integral) for one function; integral is None if it diverges."""
+        roots = self.logic.find_roots(func_str, x_min, x_max)
+        minima, maxima = self.logic.find_extrema(func_str, x_min, x_max)
+        try:
+            integral, _ = self.logic.integrate(func_str, x_min, x_max)
+        except ValueError:
+            integral = None
+        return roots, minima, maxima, integral
+
+    def show_analysis(self, updates):
+        """Marks roots and extrema on the axes and lists the results below the plot."""
+        self.remove_markers()
+        summary = []
+        for slot, func_str, color, (roots, minima, maxima, integral) in updates:
+            for x_values, y_values, marker in (
+                (roots, np.zeros_like(roots), "o"),
+                (minima, self.logic.evaluate_function_array(func_str, minima), "v"),
+                (maxima, self.logic.evaluate_function_array(func_str, maxima), "^"),
+            ):
+                if x_values.size:
+                    markers, = self.ax.plot(x_values, y_values, marker, color=color, animated=True)
+                    self.markers.append(markers)
+            area = "undefined" if integral is None else f"{integral:.10g}"
+            summary.append(f"{func_str}: {len(roots)} roots, {len(minima)} minima, {len(maxima)} maxima, integral = {area}")
+        self.analysis_label.config(text="\n".join(summary))
+        if self.background is None:
+            with profiling.span("graphing.canvas_draw"):
+                self.canvas.draw()
+        else:
+            self.blit()
+
+    def remove_markers(self):
+        """Removes the analysis markers and summary."""
+        for markers in self.markers:
+            markers.remove()
+        self.markers = []
+        self.analysis_label.config(text="")
+
+    def remove_lines(self):
+        """Removes the slot lines, their analysis markers and the legend."""
+        self.remove_markers()
+        for line in self.lines.values():
+            line.remove()
+        self.lines.clear()
+        self.full_data.clear()
+        self.line_keys.clear()
+        if self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+    def display_data(self, slot, x_min=-np.inf, x_max=np.inf):
+        """Returns what the slot line draws: for y = f(x), the envelope of its samples in [x_min, x_max] per pixel column."""
+        x_values, y_values = self.full_data[slot]
+        if self.line_mode != "y = f(x)":
+            return x_values, y_values
+        return decimate_range(x_values, y_values, x_min, x_max, int(self.ax.bbox.width))
+
+    def shows_full_data(self, slot, x_min, x_max, pixels):
+        """Returns True if the slot's samples can draw the view: it is the plotted one, or they span it at pixel density."""
+        if self.line_keys.get(slot) is not None:
+            return True
+        x_values = self.full_data[slot][0]
+        visible = np.searchsorted(x_values, x_max, "right") - np.searchsorted(x_values, x_min)
+        return x_values[0] <= x_min and x_values[-1] >= x_max and visible >= pixels
+
+    def on_resize(self, event):
+        """Recomputes the line envelopes for the new canvas width."""
+        if self.lines and self.line_mode == "y = f(x)":
+            self.refresh_view()
+
+    def on_draw(self, event):
+        """Caches the static background after a full draw and paints the lines over it."""
+        ## savefig draws the animated artists itself, through another canvas
+        if self.fig.canvas.is_saving():
+            return
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        """Draws the slot lines, analysis markers and the legend onto the canvas."""
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+        for markers in self.markers:
+            self.ax.draw_artist(markers)
+        if self.ax.get_legend() is not None:
+            self.ax.draw_artist(self.ax.get_legend())
+
+    @profiling.timed("graphing.blit")
+    def blit(self):
+        """Redraws only the animated artists over the cached background."""
+        self.canvas.restore_region(self.background)
+        self.draw_animated()
+        self.canvas.blit(self.ax.bbox)
+
+    def on_scroll(self, event):
+        """Zooms in or out around the cursor."""
+        if event.inaxes is not self.ax or not self.lines or self.line_mode != "y = f(x)":
+            return
+        scale = 1 / ZOOM_STEP if event.button == "up" else ZOOM_STEP
+        x_min, x_max = self.ax.get_xlim()
+        y_min, y_max = self.ax.get_ylim()
+        self.ax.set_xlim(event.xdata - (event.xdata - x_min) * scale, event.xdata + (x_max - event.xdata) * scale)
+        self.ax.set_ylim(event.ydata - (event.ydata - y_min) * scale, event.ydata + (y_max - event.ydata) * scale)
+        self.view_changed()
+
+    def on_press(self, event):
+        """Starts a pan when the left button is pressed inside the axes."""
+        if event.inaxes is self.ax and event.button == 1 and self.lines and self.line_mode == "y = f(x)":
+            self.drag_start = (event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim())
+
+    def on_motion(self, event):
+        """Pans the view while dragging."""
+        if self.drag_start is None:
+            return
+        start_x, start_y, (x_min, x_max), (y_min, y_max) = self.drag_start
+        dx = (event.x - start_x) * (x_max - x_min) / self.ax.bbox.width
+        dy = (event.y - start_y) * (y_max - y_min) / self.ax.bbox.height
+        self.ax.set_xlim(x_min - dx, x_max - dx)
+        self.ax.set_ylim(y_min - dy, y_max - dy)
+        self.view_changed()
+
+    def on_release(self, event):
+        """Ends a pan."""
+        self.drag_start = None
+
+    def view_changed(self):
+        """Syncs the range entries with the view and resamples the lines for it."""
+        x_min, x_max = self.ax.get_xlim()
+        self.xmin_entry.delete(0, tk.END)
+        self.xmin_entry.insert(0, f"{x_min:.6g}")
+        self.xmax_entry.delete(0, tk.END)
+        self.xmax_entry.insert(0, f"{x_max:.6g}")
+        ## The lines no longer show the view their Plot settings produced
+        for slot in self.line_keys:
+            self.line_keys[slot] = None
+        self.refresh_view()
+
+    def refresh_view(self):
+        """Sets the line data for the view, from the plotted samples or the tile cache, and queues missing tiles."""
+        x_min, x_max = self.ax.get_xlim()
+        pixels = int(self.ax.bbox.width)
+        plotted = {normalize_expression(line.get_label()) for line in self.lines.values()}
+        self.failed_tiles = {key for key in self.failed_tiles if key[0] in plotted}
+        for slot, line in self.lines.items():
+            if self.shows_full_data(slot, x_min, x_max, pixels):
+                line.set_data(*self.display_data(slot, x_min, x_max))
+                continue
+            x_values, y_values, missing = self.tile_cache.lookup(line.get_label(), x_min, x_max, pixels)
+            line.set_data(x_values, y_values)
+            for key in missing:
+                if key not in self.tile_jobs and key not in self.failed_tiles:
+                    self.tile_jobs[key] = self.executor.submit(self.tile_cache.fill, key)
+        self.canvas.draw_idle()
+        if self.tile_jobs and not self.polling_tiles:
+            self.polling_tiles = True
+            self.after(POLL_INTERVAL_MS, self.poll_tiles)
+
+    def poll_tiles(self):
+        """Refreshes the view as queued tiles arrive."""
+        self.polling_tiles = False
+        done = [key for key, future in self.tile_jobs.items() if future.done()]
+        for key in done:
+            future = self.tile_jobs.pop(key)
+            if not future.cancelled() and future.exception() is not None:
+                self.failed_tiles.add(key)
+        if done:
+            self.refresh_view()
+        if self.tile_jobs and not self.polling_tiles:
+            self.polling_tiles = True
+            self.after(POLL_INTERVAL_MS, self.poll_tiles)
+
+    def cancel_pending(self):
+        """Cancels queued evaluations and hides the progress indicator."""
+        for future in self.pending:
+            future.cancel()
+        self.pending = []
+        self.requested = []
+        self.progress.stop()
+        self.progress.grid_remove()
+
+    def on_destroy(self, event):
+        """Shuts the worker pool down when the graphing window closes."""
+        if event.widget is self:
+            self.plot_job += 1
+            self.tile_jobs.clear()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            if self.sweep_pool is not None:
+                self.sweep_pool.terminate()
 
     def clear_plot(self):
         """Clears the plot."""
-        self.ax.clear()
+        self.cancel_pending()
+        self.plot_job += 1
+        self.remove_lines()
+        if self.field is not None:
+            self.remove_field()
         self.canvas.draw()
 
     def save_plot(self):
-        """Saves the current plot to a file."""
+        """Saves the current plot as an image, or the sampled line data as .npy, .npz or .csv."""
         try:
-            file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png"), ("All files", "*.*")])
-            if file_path:
-                self.fig.savefig(file_path)
+            file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=SAVE_FILETYPES)
+            if not file_path:
+                return
+            if not file_path.lower().endswith(DATA_EXTENSIONS):
+                export.save_figure(self.fig, file_path)
                 messagebox.showinfo("Success", "Plot saved successfully.")
+                return
+            if not self.lines:
+                messagebox.showinfo("Info", "Please plot at least one function to export its data.")
+                return
+            ## Large exports are written in the background; the arrays are replaced, never modified, on replot
+            curves = [(line.get_label(), *self.full_data[slot]) for slot, line in sorted(self.lines.items())]
+            self.poll_save(self.executor.submit(export.export_plot, file_path, self.fig, curves))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save plot: {e}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to save plot: {e}")
+
+    def poll_save(self, future):
+        """Reports the outcome of a background data export once it finishes."""
+        if not future.done():
+            self.after(POLL_INTERVAL_MS, self.poll_save, future)
+        elif future.exception() is not None:
+            messagebox.showerror("Error", f"Failed to save plot: {future.exception()}")
+        else:
+            messagebox.showinfo("Success", "Plot saved successfully.")
@@ -0,0 +1,126 @@
+import argparse
+import csv
+import itertools
+import sys
+import time
+from multiprocessing import Pool
+from calculator import CalculatorLogic
+
+##Rows handed to the worker pool per round; bounds memory regardless of input size
+BATCH_ROWS = 4096
+
+_worker_logic = None
+
+def read_rows(stream, use_csv):
+    """Yields (expression, variables, error) triples from an input stream.
+
+    Plain input has one expression per line. CSV input needs a header whose
+    "expression" column holds the expression; every other column is a
+    variable bound to that row's value. A row with a missing or non-numeric
+    value keeps the cell's text and carries an error instead of stopping the
+    stream.
+    """
+    if not use_csv:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield line, {}, ""
+        return
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    if "expression" not in header:
+        raise ValueError("CSV input needs an 'expression' column")
+    expression_index = header.index("expression")
+    for row in reader:
+        if not row:
+            continue
+        row = row + [""] * (len(header) - len(row))
+        variables = {}
+        error = ""
+        for i, (name, value) in enumerate(zip(header, row)):
+            if i == expression_index:
+                continue
+            try:
+                variables[name] = float(value)
+            except ValueError:
+                variables[name] = value
+                if not error:
+                    error = f"missing value for '{name}'" if not value.strip() else f"value '{value}' for '{name}' is not a number"
+        yield row[expression_index], variables, error
+
+def evaluate_row(logic, row):
+    """Evaluates one input row and returns (expression, variables, result, error)."""
+    expression, variables, error = row
+    if error:
+        return expression, variables, "", error
+    try:
+        return expression, variables, str(logic.evaluate_expression(expression, variables)), ""
+    except ValueError as e:
+        return expression, variables, "", str(e)
+
+def _init_worker():
+    global _worker_logic
+    _worker_logic = CalculatorLogic()
+
+def _evaluate_in_worker(row):
+    return evaluate_row(_worker_logic, row)
+
+def evaluate_stream(rows, workers=1, batch_rows=BATCH_ROWS):
+    """Evaluates rows lazily, in input order, optionally across a process pool."""
+    if workers <= 1:
+        logic = CalculatorLogic()
+        for row in rows:
+            yield evaluate_row(logic, row)
+        return
+    with Pool(workers, initializer=_init_worker) as pool:
+        chunksize = max(1, batch_rows // (workers * 4))
+        while True:
+            batch = list(itertools.islice(rows, batch_rows))
+            if not batch:
+                break
+            yield from pool.map(_evaluate_in_worker, batch, chunksize)
+
+def run(stream, out, use_csv=False, workers=1, batch_rows=BATCH_ROWS):
+    """Evaluates every row of stream, writes CSV results to out and returns (rows, seconds)."""
+    writer = csv.writer(out)
+    start = time.perf_counter()
+    count = 0
+    variable_names = None
+    for expression, variables, result, error in evaluate_stream(read_rows(stream, use_csv), workers, batch_rows):
+        if variable_names is None:
+            variable_names = list(variables)
+            writer.writerow(["expression", *variable_names, "result", "error"])
+        writer.writerow([expression, *variables.values(), result, error])
+        count += 1
+        if count % batch_rows == 0:
+            out.flush()
+    out.flush()
+    return count, time.perf_counter() - start
+
+def main(argv=None):
+    """Command-line entry point for evaluating expressions without a display."""
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions without a display.")
+    parser.add_argument("input", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("--csv", action="store_true", help="input is CSV with an 'expression' column and one column per variable")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="rows per round when using workers")
+    parser.add_argument("--quiet", action="store_true", help="do not print the throughput report")
+    args = parser.parse_args(argv)
+
+    stream = open(args.input, newline="") if args.input else sys.stdin
+    try:
+        rows, seconds = run(stream, sys.stdout, args.csv, args.workers, args.batch_rows)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if args.input:
+            stream.close()
+    if not args.quiet:
+        rate = rows / seconds if seconds > 0 else float("inf")
+        print(f"{rows} rows in {seconds:.3f} s ({rate:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
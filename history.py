@@ -0,0 +1,115 @@
+import json
+import os
+import time
+from collections import deque, namedtuple
+from decimal import Decimal
+from fractions import Fraction
+
+HistoryRecord = namedtuple("HistoryRecord", ["timestamp", "previous", "operation", "current", "result"])
+
+##The history file is rewritten on load once it holds this many times the ring capacity
+COMPACT_FACTOR = 4
+##Operation of records whose previous field is a whole typed formula
+FORMULA = "formula"
+
+def format_record(record):
+    """Formats a record the way the history display shows it."""
+    if record.operation == FORMULA:
+        return f"{record.previous} = {record.result}"
+    return f"{record.previous} {record.operation} {record.current} = {record.result}"
+
+def _encode(value):
+    return str(value) if isinstance(value, (complex, Decimal, Fraction)) else value
+
+def _decode(value):
+    if not isinstance(value, str):
+        return value
+    if "j" in value:
+        return complex(value)
+    return Fraction(value) if "/" in value else Decimal(value)
+
+class HistoryStore:
+    """Bounded ring buffer of calculation records, optionally persisted to an append-only file.
+
+    Each record is written as one JSON line when it is added, so the file
+    is never rewritten during a session; on load only the newest maxlen
+    records are kept in memory.
+    """
+
+    def __init__(self, maxlen=1000, path=None):
+        self.maxlen = maxlen
+        self.path = path
+        self.records = deque(maxlen=maxlen)
+        if path and os.path.exists(path):
+            try:
+                self.load()
+            except (OSError, UnicodeDecodeError):
+                ## An unreadable history file leaves the history empty rather than stopping the calculator
+                pass
+
+    def add(self, previous, operation, current, result):
+        """Records one calculation and appends it to the history file."""
+        record = HistoryRecord(time.time(), previous, operation, current, result)
+        self.records.append(record)
+        if self.path:
+            try:
+                with open(self.path, "a") as f:
+                    f.write(self._dumps(record) + "\n")
+            except OSError:
+                pass
+        return record
+
+    def last(self, count, skip=0):
+        """Returns the newest count records before the skip newest ones, oldest first."""
+        stop = max(len(self.records) - skip, 0)
+        start = max(stop - count, 0)
+        return [self.records[i] for i in range(start, stop)]
+
+    def page(self, number, size=20):
+        """Returns page number (0 is the newest page) of size records, oldest first."""
+        stop = max(len(self.records) - number * size, 0)
+        start = max(stop - size, 0)
+        return [self.records[i] for i in range(start, stop)]
+
+    def page_count(self, size=20):
+        """Returns the number of pages of the given size."""
+        return -(-len(self.records) // size)
+
+    def load(self):
+        """Reads the newest records from the history file, compacting it if it has grown large."""
+        lines = 0
+        with open(self.path, errors="replace") as f:
+            for line in f:
+                lines += 1
+                try:
+                    self.records.append(self._loads(line))
+                except (ValueError, TypeError, ArithmeticError):
+                    continue
+        if lines > COMPACT_FACTOR * self.maxlen:
+            try:
+                self.compact()
+            except OSError:
+                pass
+
+    def compact(self):
+        """Rewrites the history file with only the records held in memory."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            for record in self.records:
+                f.write(self._dumps(record) + "\n")
+        os.replace(temp_path, self.path)
+
+    def _dumps(self, record):
+        return json.dumps([record.timestamp, _encode(record.previous), record.operation, _encode(record.current), _encode(record.result)])
+
+    def _loads(self, line):
+        timestamp, previous, operation, current, result = json.loads(line)
+        if operation != FORMULA:
+            previous = _decode(previous)
+        return HistoryRecord(timestamp, previous, operation, _decode(current), _decode(result))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
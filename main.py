@@ -1,15 +1,27 @@
+import time
+STARTED = time.perf_counter()
 import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
+from tkinter import ttk, messagebox, colorchooser, simpledialog, filedialog
 from calculator import CalculatorLogic
 from buttons import CalculatorButtons
 from display import CalculatorDisplay
-from graphing import GraphingFrame
+import argparse
 import json
 import os
+import sys
+import threading
+import profiling
+IMPORTED = time.perf_counter()
 
 class CalculatorApp:
-    def __init__(self, root):
+    def __init__(self, root, prewarm=True, report_startup=False, profile=False):
         self.root = root
+        if profile:
+            profiling.enable(origin=STARTED)
+            profiling.record("startup.imports", STARTED, IMPORTED)
+        self.prewarm = prewarm
+        self.report_startup = report_startup
+        self.timings = {"imports": IMPORTED - STARTED}
         self.root.title("Advanced Scientific Calculator")
         self.root.geometry("600x800")
         self.root.resizable(True, True)
@@ -18,7 +30,7 @@ class CalculatorApp:
         self.style = ttk.Style()
         self.style.theme_use("clam")
 
-        self.logic = CalculatorLogic()
+        self.logic = CalculatorLogic(history_path="history.jsonl")
         self.display = CalculatorDisplay(self.root, self.logic)
         self.buttons = CalculatorButtons(self.root, self.display, self.logic)
 
@@ -36,6 +48,9 @@ class CalculatorApp:
         self.create_menu()
         self.root.grid_rowconfigure(1, weight=1)
         self.root.grid_columnconfigure(0, weight=1)
+        self.timings["window built"] = time.perf_counter() - STARTED
+        profiling.record("startup.build window", IMPORTED)
+        self.root.bind("<Expose>", self.on_first_paint)
 
     def create_menu(self):
         """Creates the menu bar with theme and graph options."""
@@ -57,11 +72,148 @@ class CalculatorApp:
         menubar.add_cascade(label="Graph", menu=graph_menu)
         graph_menu.add_command(label="Plot Function", command=self.open_graphing_interface)
 
+        ##Precision menu
+        precision_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Precision", menu=precision_menu)
+        self.precision_var = tk.StringVar(value=self.logic.precision_mode)
+        for mode in ("float", "decimal", "fraction"):
+            precision_menu.add_radiobutton(
+                label=mode.capitalize(),
+                variable=self.precision_var,
+                value=mode,
+                command=self.set_precision
+            )
+        precision_menu.add_separator()
+        precision_menu.add_command(label="Digits...", command=self.ask_precision_digits)
+
+        ##Units menu
+        units_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Units", menu=units_menu)
+        units_menu.add_command(label="Convert...", command=self.open_unit_dialog)
+
+        ##Profiling menu
+        profiling_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Profiling", menu=profiling_menu)
+        self.profiling_var = tk.BooleanVar(value=profiling.enabled())
+        profiling_menu.add_checkbutton(label="Record", variable=self.profiling_var, command=self.toggle_profiling)
+        profiling_menu.add_command(label="Statistics...", command=self.open_stats_panel)
+        profiling_menu.add_separator()
+        profiling_menu.add_command(label="Export JSON...", command=lambda: self.export_profile(chrome_trace=False))
+        profiling_menu.add_command(label="Export Chrome Trace...", command=lambda: self.export_profile(chrome_trace=True))
+
         ##Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=self.show_about)
 
+    def set_precision(self):
+        """Switches the calculator to the precision mode selected in the menu."""
+        self.display.update(self.logic.set_precision(self.precision_var.get()))
+
+    def ask_precision_digits(self):
+        """Asks for the number of significant digits used by the decimal and fraction modes."""
+        digits = simpledialog.askinteger(
+            "Precision", "Significant digits:",
+            initialvalue=self.logic.precision_digits, minvalue=1, maxvalue=10000, parent=self.root
+        )
+        if digits:
+            self.display.update(self.logic.set_precision(self.logic.precision_mode, digits))
+
+    def open_unit_dialog(self):
+        """Opens a dialog to convert the current value between any two compatible units."""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Convert Units")
+        units = self.logic.units
+        dimensions = sorted(set(units.dimensions.values()))
+        dimension_var = tk.StringVar(value="length")
+        from_var = tk.StringVar(value="m")
+        to_var = tk.StringVar(value="km")
+
+        tk.Label(dialog, text="Quantity").grid(row=0, column=0, padx=5, pady=5)
+        dimension_box = ttk.Combobox(dialog, textvariable=dimension_var, values=dimensions, state="readonly")
+        dimension_box.grid(row=0, column=1, padx=5, pady=5)
+        tk.Label(dialog, text="From").grid(row=1, column=0, padx=5, pady=5)
+        from_box = ttk.Combobox(dialog, textvariable=from_var, state="readonly")
+        from_box.grid(row=1, column=1, padx=5, pady=5)
+        tk.Label(dialog, text="To").grid(row=2, column=0, padx=5, pady=5)
+        to_box = ttk.Combobox(dialog, textvariable=to_var, state="readonly")
+        to_box.grid(row=2, column=1, padx=5, pady=5)
+
+        def update_units(event=None):
+            names = units.units(dimension_var.get())
+            from_box.configure(values=names)
+            to_box.configure(values=names)
+            if from_var.get() not in names:
+                from_var.set(names[0])
+            if to_var.get() not in names:
+                to_var.set(names[-1])
+
+        dimension_box.bind("<<ComboboxSelected>>", update_units)
+        update_units()
+        convert_button = tk.Button(
+            dialog,
+            text="Convert",
+            command=lambda: self.display.update(self.logic.convert_units(from_var.get(), to_var.get()))
+        )
+        convert_button.grid(row=3, column=0, columnspan=2, pady=10)
+
+    def toggle_profiling(self):
+        """Starts a new recording or stops the current one."""
+        if self.profiling_var.get():
+            profiling.enable()
+        else:
+            profiling.disable()
+
+    def open_stats_panel(self):
+        """Opens a panel listing the recorded spans and counters."""
+        panel = tk.Toplevel(self.root)
+        panel.title("Profiling Statistics")
+        columns = ("calls", "total", "mean", "max")
+        tree = ttk.Treeview(panel, columns=columns)
+        tree.heading("#0", text="Span / counter")
+        tree.column("#0", width=260)
+        for column, heading in zip(columns, ("Calls", "Total (ms)", "Mean (ms)", "Max (ms)")):
+            tree.heading(column, text=heading)
+            tree.column(column, width=90, anchor="e")
+        tree.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        panel.grid_rowconfigure(0, weight=1)
+        panel.grid_columnconfigure(0, weight=1)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            recorder = profiling.recorder()
+            if recorder is None:
+                tree.insert("", tk.END, text="Nothing recorded; enable Profiling > Record")
+                return
+            for name, stats in recorder.summary().items():
+                tree.insert("", tk.END, text=name, values=(
+                    stats["calls"], f"{stats['total_ms']:.2f}", f"{stats['mean_ms']:.3f}", f"{stats['max_ms']:.2f}"
+                ))
+            for name, value in sorted(recorder.counters.items()):
+                tree.insert("", tk.END, text=name, values=(value, "", "", ""))
+
+        def reset():
+            if profiling.enabled():
+                profiling.enable()
+            refresh()
+
+        tk.Button(panel, text="Refresh", command=refresh).grid(row=1, column=0, pady=5)
+        tk.Button(panel, text="Reset", command=reset).grid(row=1, column=1, pady=5)
+        refresh()
+
+    def export_profile(self, chrome_trace):
+        """Writes the current recording to a file chosen by the user."""
+        recorder = profiling.recorder()
+        if recorder is None:
+            messagebox.showinfo("Profiling", "Nothing has been recorded yet.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if file_path:
+            try:
+                recorder.export(file_path, chrome_trace)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to export profile: {e}")
+
     def set_theme(self, theme):
         """Sets the selected theme and updates the UI."""
         self.current_theme = theme
@@ -120,8 +272,34 @@ class CalculatorApp:
                 return json.load(f)
         return {"bg": "#1e1e1e", "fg": "white", "button_bg": "#333333", "button_fg": "white"}
 
+    def on_first_paint(self, event):
+        """Records first-paint time and starts the optional background pre-warm."""
+        self.root.unbind("<Expose>")
+        self.timings["first paint"] = time.perf_counter() - STARTED
+        profiling.record("startup.first paint", STARTED)
+        if self.report_startup:
+            self.print_timings(["imports", "window built", "first paint"])
+        if self.prewarm:
+            threading.Thread(target=self.prewarm_graphing, daemon=True).start()
+
+    def prewarm_graphing(self):
+        """Imports numpy and the graphing stack in the background so the first plot opens quickly."""
+        start = time.perf_counter()
+        import numpy
+        import graphing
+        self.timings["graphing pre-warm (background)"] = time.perf_counter() - start
+        profiling.record("startup.graphing pre-warm", start)
+        if self.report_startup:
+            self.print_timings(["graphing pre-warm (background)"])
+
+    def print_timings(self, phases):
+        """Prints startup timings, measured from the start of main.py, to stderr."""
+        for phase in phases:
+            print(f"{phase:<32}{self.timings[phase] * 1000:8.1f} ms", file=sys.stderr)
+
     def open_graphing_interface(self):
         """Opens the graphing interface in a new window."""
+        from graphing import GraphingFrame
         graph_window = tk.Toplevel(self.root)
         graph_window.title("Graph Function")
         graph_window.geometry("600x600")
@@ -137,6 +315,11 @@ class CalculatorApp:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Advanced Scientific Calculator")
+    parser.add_argument("--startup-timing", action="store_true", help="print import and first-paint timings")
+    parser.add_argument("--no-prewarm", action="store_true", help="do not load the graphing stack in the background")
+    parser.add_argument("--profile", action="store_true", help="record timing spans from startup (see the Profiling menu)")
+    args = parser.parse_args()
     root = tk.Tk()
-    app = CalculatorApp(root)
+    app = CalculatorApp(root, prewarm=not args.no_prewarm, report_startup=args.startup_timing, profile=args.profile)
     app.run()
\ No newline at end of file
@@ -0,0 +1,60 @@
+import math
+import cmath
+from collections import namedtuple
+
+ScientificOperation = namedtuple("ScientificOperation", ["real", "real_degrees", "complex", "array", "domain"])
+ScientificOperation.__doc__ = """Kernels and metadata for one scientific operation.
+
+real and real_degrees take a float in radian and degree mode (they are the
+same function for operations without an angle argument), complex takes a
+complex number, array names the NumPy ufunc used for whole arrays, and
+domain is a predicate on real inputs, usable on floats and arrays alike.
+"""
+
+DEGREES = math.pi / 180
+
+def _angle(real_func, complex_func, array_name):
+    return ScientificOperation(real_func, lambda x: real_func(x * DEGREES), complex_func, array_name, None)
+
+def _plain(real_func, complex_func, array_name, domain=None):
+    return ScientificOperation(real_func, real_func, complex_func, array_name, domain)
+
+##Registry behind CalculatorLogic.scientific_operation and scientific_operation_array
+SCIENTIFIC_OPERATIONS = {
+    "sin": _angle(math.sin, cmath.sin, "sin"),
+    "cos": _angle(math.cos, cmath.cos, "cos"),
+    "tan": _angle(math.tan, cmath.tan, "tan"),
+    "sinh": _plain(math.sinh, cmath.sinh, "sinh"),
+    "cosh": _plain(math.cosh, cmath.cosh, "cosh"),
+    "tanh": _plain(math.tanh, cmath.tanh, "tanh"),
+    "asin": _plain(math.asin, cmath.asin, "arcsin", lambda x: (x >= -1) & (x <= 1)),
+    "acos": _plain(math.acos, cmath.acos, "arccos", lambda x: (x >= -1) & (x <= 1)),
+    "atan": _plain(math.atan, cmath.atan, "arctan"),
+    "log": _plain(math.log10, cmath.log10, "log10", lambda x: x > 0),
+    "ln": _plain(math.log, cmath.log, "log", lambda x: x > 0),
+    "sqrt": _plain(math.sqrt, cmath.sqrt, "sqrt", lambda x: x >= 0),
+    "exp": _plain(math.exp, cmath.exp, "exp"),
+}
+
+def apply_array(op, values, is_radians=True):
+    """Applies a scientific operation to a whole array with the same semantics as the buttons.
+
+    Real input follows the angle mode for sin, cos and tan; complex input is
+    used as is. Where the button would show "Error" (outside the domain, or
+    an overflow to infinity) the result is NaN.
+    """
+    import numpy as np
+    operation = SCIENTIFIC_OPERATIONS[op]
+    values = np.asarray(values)
+    if not np.iscomplexobj(values):
+        values = values.astype(np.float64)
+        if operation.real is not operation.real_degrees and not is_radians:
+            values = values * DEGREES
+    with np.errstate(all="ignore"):
+        result = getattr(np, operation.array)(values)
+        invalid = ~np.isfinite(result) & np.isfinite(values)
+        if operation.domain is not None and not np.iscomplexobj(values):
+            invalid |= ~operation.domain(values)
+    if invalid.any():
+        result = np.where(invalid, np.nan, result)
+    return result
@@ -0,0 +1,210 @@
+import math
+import sys
+from decimal import Decimal, getcontext, localcontext
+from fractions import Fraction
+
+PRECISION_MODES = ("float", "decimal", "fraction")
+
+##Extra digits carried through intermediate steps before rounding to the requested precision
+GUARD_DIGITS = 10
+##Integer powers of fractions are computed exactly up to this many digits, at the set precision beyond;
+##the interpreter's limit on int to str conversion (sys.get_int_max_str_digits) caps it further
+MAX_EXACT_POWER_DIGITS = 10000
+
+_pi_cache = {}
+
+def parse(text, mode):
+    """Parses typed digits into the number type of mode."""
+    if mode == "decimal":
+        return Decimal(text)
+    if mode == "fraction":
+        return Fraction(text)
+    return float(text)
+
+def convert(value, mode):
+    """Converts a real number to the number type of mode.
+
+    Floats are converted through their shortest repr, so 0.1 becomes
+    Decimal("0.1") or 1/10 rather than the binary value's 55 digits.
+    """
+    if isinstance(value, float) and mode != "float" and math.isfinite(value):
+        value = Decimal(repr(value))
+    if mode == "decimal":
+        return value if isinstance(value, Decimal) else to_decimal(value)
+    if mode == "fraction":
+        return value if isinstance(value, Fraction) else Fraction(value)
+    return float(value)
+
+def to_decimal(value):
+    """Converts int, float, Fraction or Decimal to Decimal in the current context."""
+    if isinstance(value, Fraction):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    return +Decimal(value)
+
+def context(digits):
+    """Returns a decimal context manager for arithmetic at the given number of digits."""
+    ctx = getcontext().copy()
+    ctx.prec = digits
+    return localcontext(ctx)
+
+def current_digits():
+    """Returns the precision of the active decimal context."""
+    return getcontext().prec
+
+def pi(digits):
+    """Returns pi to the given number of significant digits."""
+    if digits not in _pi_cache:
+        with context(digits + GUARD_DIGITS):
+            three = Decimal(3)
+            last, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+            while s != last:
+                last = s
+                n, na = n + na, na + 8
+                d, da = d + da, da + 32
+                t = (t * n) / d
+                s += t
+        with context(digits):
+            _pi_cache[digits] = +s
+    return _pi_cache[digits]
+
+def e(digits):
+    """Returns e to the given number of significant digits."""
+    with context(digits):
+        return Decimal(1).exp()
+
+def _series(x, first, step):
+    """Sums first + ... where each term is the previous one times step(x, n), until it stops changing."""
+    total, term, n = first, first, 0
+    while True:
+        n += 1
+        term = term * step(x, n)
+        new_total = total + term
+        if new_total == total:
+            return total
+        total = new_total
+
+def _reduce_angle(x, digits):
+    """Returns x minus the nearest multiple of 2 pi, to the given number of digits.
+
+    Every digit of x before the decimal point costs a digit of the
+    remainder, so the reduction runs at that many extra digits.
+    """
+    working = digits + max(x.adjusted(), 0) + GUARD_DIGITS
+    with context(working):
+        two_pi = 2 * pi(working)
+        x = x - two_pi * (x / two_pi).to_integral_value()
+    with context(digits):
+        return +x
+
+def sin(x):
+    digits = current_digits()
+    x = _reduce_angle(x, digits)
+    return _series(x, x, lambda x, n: -x * x / ((2 * n) * (2 * n + 1)))
+
+def cos(x):
+    digits = current_digits()
+    x = _reduce_angle(x, digits)
+    return _series(x, Decimal(1), lambda x, n: -x * x / ((2 * n - 1) * (2 * n)))
+
+def tan(x):
+    return sin(x) / cos(x)
+
+def sinh(x):
+    if abs(x) < 1:
+        return _series(x, x, lambda x, n: x * x / ((2 * n) * (2 * n + 1)))
+    return (x.exp() - (-x).exp()) / 2
+
+def cosh(x):
+    return (x.exp() + (-x).exp()) / 2
+
+def tanh(x):
+    return sinh(x) / cosh(x)
+
+def atan(x):
+    digits = current_digits()
+    if abs(x) > 1:
+        half_pi = pi(digits) / 2
+        return (half_pi if x > 0 else -half_pi) - atan(1 / x)
+    ## Halve the argument until the series converges quickly
+    doublings = 0
+    while abs(x) > Decimal("0.1"):
+        x = x / (1 + (1 + x * x).sqrt())
+        doublings += 1
+    return _series(x, x, lambda x, n: -x * x * (2 * n - 1) / (2 * n + 1)) * 2 ** doublings
+
+def asin(x):
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+    if abs(x) == 1:
+        return pi(current_digits()) / 2 * x
+    return atan(x / (1 - x * x).sqrt())
+
+def acos(x):
+    return pi(current_digits()) / 2 - asin(x)
+
+def log(x):
+    if x <= 0:
+        raise ValueError("math domain error")
+    return x.log10()
+
+def ln(x):
+    if x <= 0:
+        raise ValueError("math domain error")
+    return x.ln()
+
+def sqrt(x):
+    return x.sqrt()
+
+def exp(x):
+    return x.exp()
+
+##Decimal kernels for the scientific operations, keyed like operations.SCIENTIFIC_OPERATIONS
+DECIMAL_FUNCTIONS = {
+    "sin": sin, "cos": cos, "tan": tan,
+    "sinh": sinh, "cosh": cosh, "tanh": tanh,
+    "asin": asin, "acos": acos, "atan": atan,
+    "log": log, "ln": ln, "sqrt": sqrt, "exp": exp,
+}
+ANGLE_FUNCTIONS = ("sin", "cos", "tan")
+
+def scientific(op, value, mode, digits, is_radians=True):
+    """Applies a scientific operation at the given precision and returns a number of the mode's type."""
+    func = DECIMAL_FUNCTIONS[op]
+    with context(digits + GUARD_DIGITS):
+        if op in ANGLE_FUNCTIONS:
+            ## Angles keep every integer digit for _reduce_angle, which works at the precision they need
+            x = Decimal(value) if isinstance(value, int) else to_decimal(value)
+            if not is_radians:
+                with context(digits + GUARD_DIGITS + max(x.adjusted(), 0)):
+                    x = x * pi(current_digits()) / 180
+        else:
+            x = to_decimal(value)
+        result = func(x)
+    with context(digits):
+        result = +result
+    return Fraction(result) if mode == "fraction" else result
+
+def power(base, exponent, mode, digits):
+    """Raises base to exponent, exactly for integer exponents and at the given precision otherwise.
+
+    Exact powers whose result could run past MAX_EXACT_POWER_DIGITS digits,
+    or past the digits Python will convert to a string, are computed at the given precision too, so 3^10000000 overflows at once
+    instead of building a multi-million digit fraction.
+    """
+    if mode == "fraction" and Fraction(exponent).denominator == 1 and _exact_power_digits(Fraction(base), exponent) <= _exact_power_limit():
+        return Fraction(base) ** int(exponent)
+    with context(digits + GUARD_DIGITS):
+        result = to_decimal(base) ** to_decimal(exponent)
+    with context(digits):
+        result = +result
+    return Fraction(result) if mode == "fraction" else result
+
+def _exact_power_digits(base, exponent):
+    """Returns an upper bound on the digits of the numerator or denominator of base ** exponent."""
+    bits = max(abs(base.numerator).bit_length(), base.denominator.bit_length())
+    return abs(int(exponent)) * bits * math.log10(2) + 1
+
+def _exact_power_limit():
+    """Returns MAX_EXACT_POWER_DIGITS, capped so the result can still be converted to a string."""
+    str_digits = getattr(sys, "get_int_max_str_digits", lambda: 0)()
+    return min(MAX_EXACT_POWER_DIGITS, str_digits) if str_digits else MAX_EXACT_POWER_DIGITS
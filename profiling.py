@@ -0,0 +1,149 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+##Spans kept for trace export; the per-name statistics cover every span regardless
+MAX_SPANS = 100000
+
+##The active Recorder, or None while instrumentation is off
+_recorder = None
+##The most recent Recorder, still readable after disable()
+_last = None
+
+class Recorder:
+    """Collects timing spans and counters from instrumented code.
+
+    Each span updates a per-name (calls, total, max) summary and is kept,
+    up to max_spans, for export as JSON or in Chrome trace format. Times are
+    perf_counter() seconds; exports are relative to origin.
+    """
+
+    def __init__(self, origin=None, max_spans=MAX_SPANS):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.spans = deque(maxlen=max_spans)
+        self.stats = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name, start, end):
+        """Records one span of name from start to end."""
+        duration = end - start
+        with self._lock:
+            self.spans.append((name, start, duration, threading.get_ident()))
+            stats = self.stats.get(name)
+            if stats is None:
+                self.stats[name] = [1, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                stats[2] = max(stats[2], duration)
+
+    def count(self, name, amount=1):
+        """Adds amount to the counter name."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """Returns {name: {"calls", "total_ms", "mean_ms", "max_ms"}} for every span name."""
+        with self._lock:
+            return {
+                name: {"calls": calls, "total_ms": total * 1000, "mean_ms": total * 1000 / calls, "max_ms": longest * 1000}
+                for name, (calls, total, longest) in sorted(self.stats.items())
+            }
+
+    def to_json(self):
+        """Returns the summary, counters and recorded spans as a JSON-serialisable dictionary."""
+        with self._lock:
+            spans = [
+                {"name": name, "start_ms": (start - self.origin) * 1000, "duration_ms": duration * 1000, "thread": thread}
+                for name, start, duration, thread in self.spans
+            ]
+            counters = dict(self.counters)
+        return {"summary": self.summary(), "counters": counters, "spans": spans}
+
+    def to_chrome_trace(self):
+        """Returns the spans and counters in Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        with self._lock:
+            events = [
+                {"name": name, "ph": "X", "ts": (start - self.origin) * 1e6, "dur": duration * 1e6, "pid": pid, "tid": thread}
+                for name, start, duration, thread in self.spans
+            ]
+            end = max((start + duration for _, start, duration, _ in self.spans), default=self.origin)
+            events.extend(
+                {"name": name, "ph": "C", "ts": (end - self.origin) * 1e6, "pid": pid, "args": {name: value}}
+                for name, value in self.counters.items()
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path, chrome_trace=False):
+        """Writes the recording to path as JSON, or as a Chrome trace."""
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace() if chrome_trace else self.to_json(), f)
+
+def enable(origin=None):
+    """Starts recording into a new Recorder and returns it."""
+    global _recorder, _last
+    _recorder = _last = Recorder(origin)
+    return _recorder
+
+def disable():
+    """Stops recording; the last Recorder stays available from recorder()."""
+    global _recorder
+    _recorder = None
+
+def enabled():
+    return _recorder is not None
+
+def recorder():
+    """Returns the active Recorder, or the last one after disable(), or None."""
+    return _last
+
+def record(name, start, end=None):
+    """Records a span measured by the caller, e.g. across Tk callbacks."""
+    if _recorder is not None:
+        _recorder.add_span(name, start, time.perf_counter() if end is None else end)
+
+def count(name, amount=1):
+    """Adds to a counter while recording."""
+    if _recorder is not None:
+        _recorder.count(name, amount)
+
+class span:
+    """Context manager timing its block as a span of name while recording."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter() if _recorder is not None else None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None and _recorder is not None:
+            _recorder.add_span(self.name, self.start, time.perf_counter())
+        return False
+
+def timed(name):
+    """Decorator timing every call of a function as a span of name.
+
+    While recording is off the wrapper only checks one global before calling
+    through.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start)
+        return wrapper
+    return decorator
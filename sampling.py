@@ -0,0 +1,69 @@
+import numpy as np
+
+##Golden-ratio step placing the probe of consecutive intervals at well-spread fractions, so regular oscillations cannot alias
+_PROBE_STEP = (np.sqrt(5) - 1) / 2
+##Samples spread over an interval that still bends by more than UNRESOLVED_PIXELS at the narrowest allowed width,
+##so the column of an unresolvable oscillation gets its true envelope
+UNRESOLVED_FILL = 32
+UNRESOLVED_PIXELS = 16
+
+def adaptive_sample(func, x_min, x_max, x_pixels=500, y_pixels=400, initial_points=None, oversample=32, max_depth=16):
+    """Samples func on [x_min, x_max], refining only where the curve needs it.
+
+    func takes and returns a float64 array. The seed grid has one interval
+    per pixel column (initial_points overrides that), and every interval is
+    probed at an interior point placed at a jittered fraction of its width.
+    An interval whose probe is more than one pixel of height from the chord
+    between its ends, or whose ends and probe are not all in the function's
+    domain, is split at the probe and both halves are probed in turn, down
+    to 1/oversample of a pixel column. Oscillations shorter than the seed
+    spacing are caught by the probes rather than missed between grid
+    points. An interval that still bends by many pixels at the narrowest
+    width, such as sin(1/x) near 0, is filled with UNRESOLVED_FILL samples
+    so its column shows the full envelope.
+
+    Returns the sorted x and y arrays; every sample is kept, so len(x) is the
+    number of evaluations.
+    """
+    x = np.linspace(x_min, x_max, initial_points or x_pixels + 1)
+    y = func(x)
+    finite = y[np.isfinite(y)]
+    if finite.size:
+        low, high = np.percentile(finite, [5, 95])
+        y_span = high - low
+    else:
+        y_span = 0.0
+    y_tol = (y_span if y_span > 0 else 1.0) / y_pixels
+    x_tol = (x_max - x_min) / (x_pixels * oversample)
+
+    xs, ys = [x], [y]
+    left, right, y_left, y_right = x[:-1], x[1:], y[:-1], y[1:]
+    probes = 0
+    for _ in range(max_depth):
+        if not len(left):
+            break
+        fraction = 0.25 + 0.5 * ((probes + np.arange(len(left))) * _PROBE_STEP % 1.0)
+        probes += len(left)
+        x_probe = left + (right - left) * fraction
+        y_probe = func(x_probe)
+        xs.append(x_probe)
+        ys.append(y_probe)
+        with np.errstate(all="ignore"):
+            deviation = np.abs(y_probe - (y_left + (y_right - y_left) * fraction))
+        bent = deviation > y_tol
+        in_domain = np.isfinite(y_probe)
+        split = bent | (in_domain != np.isfinite(y_left)) | (in_domain != np.isfinite(y_right))
+        narrow = np.minimum(x_probe - left, right - x_probe) <= x_tol
+        unresolved = narrow & (deviation > UNRESOLVED_PIXELS * y_tol)
+        if unresolved.any():
+            x_fill = (left[unresolved, np.newaxis] + (right - left)[unresolved, np.newaxis]
+                      * np.linspace(0, 1, UNRESOLVED_FILL + 2)[1:-1]).ravel()
+            xs.append(x_fill)
+            ys.append(func(x_fill))
+        split &= ~narrow
+        left, right = np.concatenate((left[split], x_probe[split])), np.concatenate((x_probe[split], right[split]))
+        y_left, y_right = np.concatenate((y_left[split], y_probe[split])), np.concatenate((y_probe[split], y_right[split]))
+
+    x = np.concatenate(xs)
+    order = np.argsort(x, kind="stable")
+    return x[order], np.concatenate(ys)[order]
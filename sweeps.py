@@ -0,0 +1,107 @@
+import multiprocessing
+import re
+import numpy as np
+from expressions import CONSTANTS, SCALAR_FUNCTIONS
+
+##Samples (parameter values × x points) evaluated in one broadcast pass; larger sweeps are split into chunks of values
+MAX_PASS_SAMPLES = 1 << 22
+##Most parameter values one sweep may expand to
+MAX_SWEEP_VALUES = 1000
+
+_worker_logic = None
+
+def parse_sweep(text):
+    """Parses a sweep such as "k = 1:50", "k = 0:1:0.25" or "k = 1, 2, 5" into (name, values).
+
+    A start:stop[:step] range includes stop when the steps land on it; the
+    step defaults to 1.
+    """
+    name, separator, spec = text.partition("=")
+    name = name.strip()
+    if not separator or not name.isidentifier():
+        raise ValueError("Sweep must look like k = 1:50, k = 0:1:0.25 or k = 1, 2, 5")
+    if name == "x":
+        raise ValueError("The sweep parameter cannot be x")
+    if name in SCALAR_FUNCTIONS or name in CONSTANTS:
+        raise ValueError(f"The sweep parameter cannot be the built-in name {name}")
+    try:
+        if ":" in spec:
+            bounds = [float(part) for part in spec.split(":")]
+            if len(bounds) not in (2, 3):
+                raise ValueError(f"invalid range {spec.strip()}")
+            if not all(np.isfinite(bounds)):
+                raise ValueError(f"range {spec.strip()} is not finite")
+            start, stop, step = bounds if len(bounds) == 3 else (*bounds, 1.0)
+            if step == 0 or (stop - start) / step < 0:
+                raise ValueError(f"step {step:g} does not lead from {start:g} to {stop:g}")
+            count = np.floor((stop - start) / step + 1e-9) + 1
+            if count > MAX_SWEEP_VALUES:
+                raise ValueError(f"{count:g} values; at most {MAX_SWEEP_VALUES} are supported")
+            values = start + step * np.arange(int(count))
+        else:
+            values = np.array([float(part) for part in spec.split(",")])
+            if not np.isfinite(values).all():
+                raise ValueError(f"values {spec.strip()} are not all finite")
+    except ValueError as e:
+        raise ValueError(f"Invalid sweep: {e}")
+    if len(values) > MAX_SWEEP_VALUES:
+        raise ValueError(f"Invalid sweep: {len(values)} values; at most {MAX_SWEEP_VALUES} are supported")
+    return name, values
+
+def _parameter_pattern(name):
+    return re.compile(rf"(?<![\w.]){re.escape(name)}(?!\w)")
+
+def uses_parameter(func_str, name):
+    """Returns True if func_str refers to the sweep parameter name."""
+    return _parameter_pattern(name).search(func_str) is not None
+
+def substitute(func_str, name, value):
+    """Returns func_str with the parameter replaced by value, e.g. sin(k*x) with k = 2 gives sin(2*x)."""
+    text = f"{value:.12g}"
+    if value < 0:
+        text = f"({text})"
+    return _parameter_pattern(name).sub(text, func_str)
+
+def pass_count(values, points, max_samples=MAX_PASS_SAMPLES):
+    """Returns how many passes a sweep of values parameter values over points x values takes."""
+    rows = max(1, max_samples // max(points, 1))
+    return -(-values // rows)
+
+def evaluate_rows(logic, func_str, name, values, x_values):
+    """Evaluates func_str for every value of the parameter in one broadcast pass.
+
+    Returns a (len(values), len(x_values)) float64 array, NaN wherever a
+    curve is undefined.
+    """
+    return logic.evaluate_expression_array(func_str, {"x": x_values[np.newaxis, :], name: values[:, np.newaxis]})
+
+def _init_worker():
+    global _worker_logic
+    from calculator import CalculatorLogic
+    _worker_logic = CalculatorLogic()
+
+def _evaluate_in_worker(task):
+    return evaluate_rows(_worker_logic, *task)
+
+def make_pool(workers=None):
+    """Returns a process pool for evaluate_sweep; workers are spawned, not forked from a Tk process."""
+    return multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker)
+
+def evaluate_sweep(logic, func_str, name, values, x_values, pool=None, max_samples=MAX_PASS_SAMPLES):
+    """Evaluates func_str for every parameter value over x_values as a 2D array, one row per value.
+
+    Sweeps up to max_samples samples take a single broadcast pass. Larger
+    ones are split into chunks of values, evaluated across pool when one is
+    given and in turn otherwise, so no temporary array exceeds the bound.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    x_values = np.asarray(x_values, dtype=np.float64)
+    if pass_count(len(values), len(x_values), max_samples) <= 1:
+        return evaluate_rows(logic, func_str, name, values, x_values)
+    rows = max(1, max_samples // len(x_values))
+    tasks = [(func_str, name, values[start:start + rows], x_values) for start in range(0, len(values), rows)]
+    if pool is None:
+        chunks = [evaluate_rows(logic, *task) for task in tasks]
+    else:
+        chunks = pool.map(_evaluate_in_worker, tasks)
+    return np.vstack(chunks)
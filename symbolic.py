@@ -0,0 +1,319 @@
+import ast
+import math
+import operator
+import sys
+
+##Integer powers whose result could take more bits than a float's range are computed in floating point instead of exactly
+MAX_FOLDED_POWER_BITS = sys.float_info.max_exp
+
+##IR operator for each whitelisted AST operator
+AST_OPERATORS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+    ast.UAdd: "pos",
+    ast.USub: "neg",
+}
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "//": operator.floordiv,
+    "%": operator.mod,
+    "**": operator.pow,
+    "pos": operator.pos,
+    "neg": operator.neg,
+}
+_AST_BINARY = {op: ast_type for ast_type, op in AST_OPERATORS.items() if op not in ("pos", "neg")}
+_AST_UNARY = {"pos": ast.UAdd, "neg": ast.USub}
+
+def is_large_power(base, exponent):
+    """Returns True for integer powers whose result may be too large for a float.
+
+    The result takes at most base.bit_length() * |exponent| bits, so a big
+    base with a small exponent, such as (10**1000)**1000, counts too. Such
+    powers overflow to inf as soon as they meet a float, so computing every
+    digit would only cost time.
+    """
+    return isinstance(base, int) and isinstance(exponent, int) and base.bit_length() * abs(exponent) > MAX_FOLDED_POWER_BITS
+
+def float_power(base, exponent):
+    """Returns an integer power as a float, inf when it overflows, instead of computing every digit.
+
+    An exact power such as 10**10**10 would take unbounded time and memory,
+    while its float value overflows or underflows at once.
+    """
+    try:
+        return float(base) ** exponent
+    except OverflowError:
+        return -math.inf if base < 0 and exponent % 2 else math.inf
+
+class Node:
+    """One operation of an ExpressionGraph.
+
+    op is "const" (args holds the value), "var" (args holds the name), a key
+    of OPERATORS, or a function name. Nodes are interned by their graph, so
+    structurally equal subexpressions are the same object.
+    """
+
+    __slots__ = ("op", "args", "index")
+
+    def __init__(self, op, args, index):
+        self.op = op
+        self.args = args
+        self.index = index
+
+    @property
+    def value(self):
+        return self.args[0] if self.op == "const" else None
+
+    def is_constant(self, value):
+        return self.op == "const" and not isinstance(self.args[0], bool) and self.args[0] == value
+
+class ExpressionGraph:
+    """Hash-consed expression DAG with simplification and forward-mode differentiation.
+
+    Building a node folds constant operands, drops identity operations
+    (x - 0, x * 1, x ** 1, - -x) and orders the operands of + and * so that
+    equal subexpressions share one node; lower_graph then evaluates each
+    shared node once.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+
+    def _intern(self, op, args, key=None):
+        key = key or (op, args)
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = Node(op, args, len(self._nodes))
+        return node
+
+    def constant(self, value):
+        ## repr keeps -0.0 and 0.0 (and 1 and 1.0) apart
+        return self._intern("const", (value,), ("const", type(value), repr(value)))
+
+    def variable(self, name):
+        return self._intern("var", (name,))
+
+    def call(self, name, *arguments):
+        return self._intern(name, arguments)
+
+    def unary(self, op, operand):
+        if operand.op == "const":
+            folded = self._fold(OPERATORS[op], operand.value)
+            if folded is not None:
+                return folded
+        if op == "pos":
+            return operand
+        if operand.op == "neg":
+            return operand.args[0]
+        return self._intern(op, (operand,))
+
+    def binary(self, op, left, right):
+        if left.op == "const" and right.op == "const":
+            large = op == "**" and is_large_power(left.value, right.value)
+            folded = self._fold(float_power if large else OPERATORS[op], left.value, right.value)
+            if folded is not None:
+                return folded
+        ## Only identities that hold exactly in floating point, signed zeros included:
+        ## 0.0 + x is 0.0 for x = -0.0, so x + 0 is kept while x - 0 is dropped
+        if op == "-" and right.is_constant(0) and math.copysign(1, right.value.real) > 0:
+            return left
+        if op in ("*", "**") and right.is_constant(1):
+            return left
+        if op == "*" and left.is_constant(1):
+            return right
+        if op == "*" and (left.is_constant(-1) or right.is_constant(-1)):
+            return self.unary("neg", right if left.is_constant(-1) else left)
+        if op in ("+", "*") and left.index > right.index:
+            left, right = right, left
+        return self._intern(op, (left, right))
+
+    def _fold(self, func, *values):
+        """Returns the constant node for func(*values), or None if it fails so the error surfaces at run time."""
+        try:
+            return self.constant(func(*values))
+        except (ArithmeticError, ValueError, TypeError):
+            return None
+
+    def from_ast(self, node):
+        """Converts a validated, folded expression AST into a node of this graph."""
+        if isinstance(node, ast.Constant):
+            return self.constant(node.value)
+        if isinstance(node, ast.Name):
+            return self.variable(node.id)
+        if isinstance(node, ast.BinOp):
+            return self.binary(AST_OPERATORS[type(node.op)], self.from_ast(node.left), self.from_ast(node.right))
+        if isinstance(node, ast.UnaryOp):
+            return self.unary(AST_OPERATORS[type(node.op)], self.from_ast(node.operand))
+        if isinstance(node, ast.Call):
+            return self.call(node.func.id, *(self.from_ast(arg) for arg in node.args))
+        raise ValueError(f"unsupported syntax {type(node).__name__}")
+
+    def derivative(self, node, variable):
+        """Returns the node for d(node)/d(variable), built by forward-mode differentiation.
+
+        Every node gets a tangent from the tangents of its operands; zero
+        tangents are tracked as None so constant subtrees add no terms.
+        """
+        tangents = {}
+
+        def tangent(node):
+            if node not in tangents:
+                tangents[node] = self._tangent(node, variable, tangent)
+            return tangents[node]
+
+        return tangent(node) or self.constant(0)
+
+    def _tangent(self, node, variable, tangent):
+        op, args = node.op, node.args
+        if op == "const":
+            return None
+        if op == "var":
+            return self.constant(1) if args[0] == variable else None
+        if op in ("+", "-"):
+            da, db = tangent(args[0]), tangent(args[1])
+            if db is None:
+                return da
+            if da is None:
+                return db if op == "+" else self.unary("neg", db)
+            return self.binary(op, da, db)
+        if op in ("pos", "neg"):
+            da = tangent(args[0])
+            return da and self.unary(op, da)
+        if op == "*":
+            a, b = args
+            return self._sum(self._product(tangent(a), b), self._product(a, tangent(b)))
+        if op == "/":
+            a, b = args
+            da, db = tangent(a), tangent(b)
+            if db is None:
+                return da and self.binary("/", da, b)
+            ## (a / b)' = (a' - (a / b) * b') / b, reusing the quotient itself
+            numerator = self.binary("*", node, db)
+            numerator = self.binary("-", da, numerator) if da is not None else self.unary("neg", numerator)
+            return self.binary("/", numerator, b)
+        if op == "**":
+            a, b = args
+            da, db = tangent(a), tangent(b)
+            if db is None:
+                return da and self.binary("*", self.binary("*", b, self.binary("**", a, self.binary("-", b, self.constant(1)))), da)
+            ## (a ** b)' = a ** b * (b' * ln(a) + b * a' / a)
+            rate = self._sum(self.binary("*", db, self.call("ln", a)), self._product(self.binary("/", b, a), da))
+            return self.binary("*", node, rate)
+        if op == "//":
+            ## Piecewise constant, so zero wherever it is differentiable
+            return None
+        if op == "%":
+            a, b = args
+            return self._sum(tangent(a), self._product(self.unary("neg", self.binary("//", a, b)), tangent(b)))
+        if len(args) != 1:
+            raise ValueError(f"cannot differentiate {op} with {len(args)} arguments")
+        a = args[0]
+        da = tangent(a)
+        if da is None:
+            return None
+        if op == "sin":
+            outer = self.call("cos", a)
+        elif op == "cos":
+            outer = self.unary("neg", self.call("sin", a))
+        elif op == "tan":
+            outer = self.binary("+", self.constant(1), self.binary("*", node, node))
+        elif op == "exp":
+            outer = node
+        elif op == "ln":
+            return self.binary("/", da, a)
+        elif op == "log":
+            return self.binary("/", da, self.binary("*", a, self.constant(math.log(10))))
+        elif op == "sqrt":
+            return self.binary("/", da, self.binary("*", self.constant(2), node))
+        else:
+            raise ValueError(f"cannot differentiate {op}")
+        return self.binary("*", outer, da)
+
+    def _product(self, a, b):
+        return None if a is None or b is None else self.binary("*", a, b)
+
+    def _sum(self, a, b):
+        if a is None or b is None:
+            return a if b is None else b
+        return self.binary("+", a, b)
+
+def to_ast(node, names=None):
+    """Converts a node back to an AST expression; nodes in names are referenced by their temporary name."""
+    if names and node in names:
+        return ast.Name(names[node], ast.Load())
+    op, args = node.op, node.args
+    if op == "const":
+        value = args[0]
+        ## Negative numbers are written as negations so that unparsed text keeps its meaning, e.g. (-2) ** x;
+        ## copysign also catches -0.0, but ints are compared directly since a huge one does not convert to float
+        if isinstance(value, int) and value < 0 or isinstance(value, float) and math.copysign(1, value) < 0:
+            return ast.UnaryOp(ast.USub(), ast.Constant(-value))
+        return ast.Constant(value)
+    if op == "var":
+        return ast.Name(args[0], ast.Load())
+    if op in _AST_UNARY:
+        return ast.UnaryOp(_AST_UNARY[op](), to_ast(args[0], names))
+    if op in _AST_BINARY:
+        return ast.BinOp(to_ast(args[0], names), _AST_BINARY[op](), to_ast(args[1], names))
+    return ast.Call(ast.Name(op, ast.Load()), [to_ast(arg, names) for arg in args], [])
+
+def format_node(node):
+    """Returns the node as expression text, e.g. for showing a generated derivative."""
+    return ast.unparse(to_ast(node))
+
+def _usage(outputs):
+    """Returns the number of references to each node and the nodes in dependency order."""
+    counts = {}
+    order = []
+
+    def visit(node):
+        counts[node] = counts.get(node, 0) + 1
+        if counts[node] == 1:
+            if node.op not in ("const", "var"):
+                for arg in node.args:
+                    visit(arg)
+            order.append(node)
+
+    for node in outputs:
+        visit(node)
+    return counts, order
+
+def lower_graph(outputs, functions):
+    """Compiles nodes of a graph to one function taking a variable dictionary.
+
+    Every operation node referenced more than once is computed once into a
+    temporary, so common subexpressions within and across the outputs cost a
+    single evaluation. The function returns the value of a single output or
+    a tuple for several.
+    """
+    counts, order = _usage(outputs)
+    function = ast.parse("def _evaluate(_env):\n    pass").body[0]
+    ## Variables are read into _v{n} locals so that no user name can collide
+    ## with a temporary, _env or a function name in the generated code
+    variables = [node for node in order if node.op == "var"]
+    names = {node: f"_v{i}" for i, node in enumerate(variables)}
+    function.body = [
+        ast.Assign([ast.Name(names[node], ast.Store())], ast.Subscript(ast.Name("_env", ast.Load()), ast.Constant(node.args[0]), ast.Load()))
+        for node in variables
+    ]
+    temporaries = 0
+    for node in order:
+        if counts[node] > 1 and node.op not in ("const", "var"):
+            value = to_ast(node, names)
+            names[node] = f"_t{temporaries}"
+            temporaries += 1
+            function.body.append(ast.Assign([ast.Name(names[node], ast.Store())], value))
+    results = [to_ast(node, names) for node in outputs]
+    function.body.append(ast.Return(results[0] if len(results) == 1 else ast.Tuple(results, ast.Load())))
+    code = compile(ast.fix_missing_locations(ast.Module([function], [])), "<function>", "exec")
+    namespace = dict(functions, __builtins__=None)
+    exec(code, namespace)
+    return namespace["_evaluate"]
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from analysis import find_extrema, find_roots, integrate
+from calculator import CalculatorLogic
+
+def test_roots_are_refined_and_poles_skipped():
+    assert np.allclose(find_roots(lambda x: x**2 - 2, -3, 3), [-np.sqrt(2), np.sqrt(2)], atol=1e-12)
+    with np.errstate(divide="ignore"):
+        assert len(find_roots(lambda x: 1 / x, -1, 1)) == 0
+
+def test_extrema():
+    minima, maxima = find_extrema(lambda x: np.sin(x), 0, 2 * np.pi)
+    assert np.allclose(minima, [3 * np.pi / 2], atol=1e-6)
+    assert np.allclose(maxima, [np.pi / 2], atol=1e-6)
+
+@pytest.mark.parametrize("func, a, b, expected", [
+    (np.sin, 0, np.pi, 2),
+    (lambda x: np.exp(-x**2), -10, 10, np.sqrt(np.pi)),
+    (np.sqrt, 0, 1, 2 / 3),
+    (lambda x: x**3, 2, -1, -3.75),
+])
+def test_integrate(func, a, b, expected):
+    value, error = integrate(func, a, b)
+    assert value == pytest.approx(expected, rel=1e-9)
+    assert error < 1e-8
+
+def test_integrate_accepts_jumps_and_rejects_divergence():
+    value, error = integrate(np.floor, 0, 3.5)
+    assert value == pytest.approx(4.5, rel=1e-12)
+    assert error < 1e-12
+    with pytest.raises(ValueError, match="converge"):
+        integrate(lambda x: 1 / x, 0, 1)
+
+def test_integrate_rejects_undefined_intervals():
+    with pytest.raises(ValueError), np.errstate(all="ignore"):
+        integrate(np.log, -1, 1)
+
+def test_calculator_analysis_uses_expressions():
+    logic = CalculatorLogic()
+    assert logic.integrate("x**2", 0, 3)[0] == pytest.approx(9)
@@ -0,0 +1,88 @@
+import time
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from calculator import CalculatorLogic
+
+def press(logic, *keys):
+    """Plays keypad presses: digits and ".", operators, "=", "!", "MS", "MR", "M+", "C" or a scientific operation."""
+    actions = {
+        "=": logic.evaluate, "!": logic.factorial, ".": logic.append_decimal, "C": logic.clear,
+        "MS": logic.memory_store, "MR": logic.memory_recall, "M+": logic.memory_add, "M-": logic.memory_subtract,
+    }
+    for key in keys:
+        if key.isdigit():
+            logic.append_digit(key)
+        elif key in actions:
+            actions[key]()
+        elif key in ("+", "-", "*", "/", "^", "mod"):
+            logic.set_operation(key)
+        else:
+            logic.scientific_operation(key)
+    return logic.current
+
+@pytest.mark.parametrize("mode, expected", [("float", "0.1"), ("decimal", "0.1"), ("fraction", "1/10")])
+def test_memory_keeps_the_typed_value(mode, expected):
+    logic = CalculatorLogic()
+    logic.set_precision(mode)
+    assert press(logic, ".", "1", "MS", "C", "MR") == expected
+    press(logic, "M+")
+    assert logic.memory_value() * 5 == 1
+
+@pytest.mark.parametrize("mode", ["float", "decimal", "fraction"])
+def test_mod_takes_the_sign_of_the_divisor(mode):
+    logic = CalculatorLogic()
+    logic.set_precision(mode)
+    parse = logic.parse_number
+    assert logic.binary_operation("mod", parse("-7"), parse("3")) == 2
+    assert logic.binary_operation("mod", parse("7"), parse("-3")) == -2
+
+@pytest.mark.parametrize("mode", ["decimal", "fraction"])
+def test_complex_operands_mix_with_precise_numbers(mode):
+    logic = CalculatorLogic()
+    logic.set_precision(mode)
+    assert logic.binary_operation("*", 2j, logic.parse_number("3")) == 6j
+    assert logic.binary_operation("+", logic.parse_number("0.5"), 1j) == 0.5 + 1j
+
+def test_decimal_mode_keeps_its_digits():
+    logic = CalculatorLogic()
+    logic.set_precision("decimal", 40)
+    assert press(logic, "1", "/", "3", "=") == "0." + "3" * 40
+
+def test_decimal_sine_of_a_huge_angle():
+    logic = CalculatorLogic()
+    logic.set_precision("decimal", 20)
+    assert logic.scientific_value("sin", Decimal("1e30")) == Decimal("-0.090116901912138058030")
+
+def test_huge_exact_powers_are_bounded():
+    logic = CalculatorLogic()
+    logic.set_precision("fraction")
+    start = time.perf_counter()
+    assert press(logic, "3", "^", "1", "0", "0", "0", "0", "0", "0", "0", "=") == "Error"
+    assert time.perf_counter() - start < 1
+    assert logic.binary_operation("^", Fraction(2, 3), 3) == Fraction(8, 27)
+    ## The exact (7/3)^6000 has 5071 digits, more than Python converts to a string by default
+    assert str(logic.binary_operation("^", Fraction(7, 3), 6000)).startswith("725624215526")
+
+def test_large_factorials_stay_usable_in_float_mode():
+    logic = CalculatorLogic()
+    assert press(logic, "1", "0", "0", "1", "!") == "4.027896473371709E+2570"
+    assert press(logic, "/", "1", "0", "=") == "4.027896473371709E+2569"
+    assert float(press(logic, "log")) == pytest.approx(2569.605078299612)
+    assert press(logic, "C", "1", "7", "0", "!", "*", "2", "=") == "1.4514831230615998e+307"
+
+def test_sine_of_a_huge_factorial():
+    logic = CalculatorLogic()
+    assert float(press(logic, "1", "0", "0", "0", "!", "sin")) == pytest.approx(-0.9728003563830543)
+    assert press(logic, "C", "1", "0", "0", "1", "!", "sin") == "Error"
+
+def test_gamma_results_are_not_padded_with_false_digits():
+    logic = CalculatorLogic()
+    logic.set_precision("decimal")
+    press(logic, ".", "5", "!")
+    assert logic.value == Decimal("0.886226925452758")
+
+def test_errors_clear_on_the_next_digit():
+    logic = CalculatorLogic()
+    assert press(logic, "1", "/", "0", "=") == "Error"
+    assert press(logic, "7") == "7"
@@ -0,0 +1,50 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from decimation import decimate_range, is_increasing, min_max_decimate
+from export import save_figure
+
+def test_min_max_decimate_keeps_the_envelope_and_gaps():
+    x = np.linspace(0, 1, 100001)
+    y = np.sin(200 * x)
+    y[50000:50010] = np.nan
+    x_small, y_small = min_max_decimate(x, y, 100)
+    assert len(x_small) <= 4 * 100 + 2
+    assert np.nanmax(y_small) == np.nanmax(y) and np.nanmin(y_small) == np.nanmin(y)
+    assert np.isnan(y_small).any()
+    assert is_increasing(x_small)
+
+def test_min_max_decimate_bins_by_x():
+    ## Dense samples crowd into the left tenth; the sparse right part must keep its own peaks
+    x = np.concatenate((np.linspace(0, 1, 90000, endpoint=False), np.linspace(1, 10, 10000)))
+    y = np.sin(5 * x)
+    x_small, y_small = min_max_decimate(x, y, 100)
+    assert len(x_small) <= 4 * 100 + 2
+    edges = np.linspace(0, 10, 101)
+    column, drawn_column = (np.minimum(np.searchsorted(edges, values, "right") - 1, 99) for values in (x, x_small))
+    for i in range(100):
+        inside, drawn = y[column == i], y_small[drawn_column == i]
+        assert drawn.max() == inside.max() and drawn.min() == inside.min()
+
+def test_decimate_range_reaches_past_the_view():
+    x = np.linspace(0, 10, 10001)
+    x_small, _ = decimate_range(x, x, 2, 3, 10)
+    assert x_small[0] < 2 and x_small[-1] > 3
+
+def test_is_increasing():
+    assert is_increasing([0, 1, 1, 2])
+    assert not is_increasing([0, 2, 1])
+
+def test_save_figure_leaves_parametric_lines_whole(tmp_path):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    t = np.linspace(0, 2 * np.pi, 20000)
+    circle, = ax.plot(np.cos(t), np.sin(t))
+    curve, = ax.plot(t, np.sin(50 * t))
+    sizes = []
+    original = circle.set_data
+    circle.set_data = lambda *data: (sizes.append(len(data[0])), original(*data))
+    save_figure(fig, str(tmp_path / "plot.svg"))
+    assert sizes == []
+    assert len(curve.get_xdata()) == 20000
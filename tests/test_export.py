@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from export import export_plot, main
+
+@pytest.mark.parametrize("name", ["out.NPY", "out.NPZ"])
+def test_raw_exports_keep_the_given_name(tmp_path, name):
+    path = tmp_path / name
+    x = np.linspace(0, 1, 5)
+    export_plot(str(path), None, [("x", x, 2 * x)])
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+    data = np.load(path)
+    y = data[:, 2] if name.endswith("NPY") else data["y0"]
+    assert np.allclose(y, 2 * x)
+
+def test_missing_input_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(tmp_path / "missing.txt"), "-o", str(tmp_path)])
+    assert exit_info.value.code == 2
+    assert "cannot read" in capsys.readouterr().err
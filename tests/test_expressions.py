@@ -0,0 +1,57 @@
+import time
+import numpy as np
+import pytest
+from calculator import CalculatorLogic
+from expressions import ExpressionCache, compile_expression
+
+@pytest.mark.parametrize("source", [
+    "__import__('os')",
+    "x.real",
+    "(lambda: 1)()",
+    "[x]",
+    "x if x else 1",
+    "open('f')",
+    "y + 1",
+    "sin(x=1)",
+    "'text'",
+    "True + x",
+])
+def test_rejects_everything_outside_the_whitelist(source):
+    with pytest.raises(ValueError):
+        compile_expression(source)
+
+@pytest.mark.parametrize("source", ["sin()", "sin(x, x)", "exp(x, 2)", "sqrt(1, 2, 3)"])
+def test_calls_take_exactly_one_argument(source):
+    with pytest.raises(ValueError, match="exactly one argument"):
+        compile_expression(source)
+
+def test_array_arguments_are_never_written_to():
+    logic = CalculatorLogic()
+    x_values = np.arange(4.0)
+    with pytest.raises(ValueError):
+        logic.evaluate_function_array("exp(x, x)", x_values)
+    assert x_values.tolist() == [0.0, 1.0, 2.0, 3.0]
+
+@pytest.mark.parametrize("source", ["10**10**10", "9**9**9", "(-3)**(2*10**6 + 1) + x", "(10**1000)**1000*0 + x"])
+def test_huge_integer_powers_do_not_hang(source):
+    logic = CalculatorLogic()
+    start = time.perf_counter()
+    _, y_values = logic.graph_function(source, 0, 1, 5)
+    assert time.perf_counter() - start < 1
+    assert np.isnan(y_values).all()
+
+def test_constants_are_folded():
+    assert compile_expression("2 * pi * x").text == f"{2 * np.pi!r} * x"
+
+def test_scalar_and_array_agree():
+    expr = compile_expression("sin(x)**2 + cos(x)**2 + x / 2")
+    x_values = np.linspace(-3, 3, 7)
+    assert np.allclose(expr.array({"x": x_values}), [expr.scalar({"x": x}) for x in x_values])
+
+def test_cache_counts_hits_and_normalizes_whitespace():
+    cache = ExpressionCache(maxsize=2)
+    assert cache.get("x  +  1") is cache.get("x + 1")
+    assert cache.info()["hits"] == 1
+    cache.get("x + 2")
+    cache.get("x + 3")
+    assert len(cache) == 2
@@ -0,0 +1,76 @@
+import re
+import pytest
+from calculator import CalculatorLogic
+from formula import FormulaParser, tokenize
+from history import FORMULA, HistoryStore
+
+@pytest.fixture
+def logic():
+    return CalculatorLogic()
+
+def value(logic, text):
+    logic.formula_line = text
+    return logic.formula_value()
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 + 3 * 4", 14),
+    ("(2 + 3) * 4", 20),
+    ("2 - 3 - 4", -5),
+    ("24 / 4 / 3", 2),
+    ("2^3^2", 512),
+    ("2**3", 8),
+    ("-2^2", -4),
+    ("(-2)^2", 4),
+    ("3! + 1", 7),
+    ("50% * 4", 2),
+    ("10 mod 4 * 2", 4),
+    ("√9^2", 9),
+    ("sqrt(16) + 1", 5),
+])
+def test_precedence(logic, text, expected):
+    assert value(logic, text) == pytest.approx(expected)
+
+def test_functions_follow_the_angle_mode(logic):
+    assert value(logic, "sin(π/2)") == pytest.approx(1)
+    logic.toggle_angle_mode()
+    assert value(logic, "sin(90)") == pytest.approx(1)
+
+@pytest.mark.parametrize("text, message", [
+    ("2 +", "incomplete"),
+    ("(2 + 3", "missing )"),
+    ("2 + 3)", "unexpected ')'"),
+    ("foo(2)", "unknown name 'foo'"),
+    ("sin 2", "needs parentheses"),
+    ("2 $ 3", "unexpected '$' at 3"),
+    ("", "empty formula"),
+])
+def test_errors(logic, text, message):
+    with pytest.raises(ValueError, match=re.escape(message)):
+        value(logic, text)
+
+def test_preview_is_empty_while_incomplete(logic):
+    logic.formula_input("1 + ")
+    assert logic.formula_preview() == ""
+    logic.formula_input("2")
+    assert logic.formula_preview() == "3.0"
+
+def test_tokenize_positions():
+    assert [(t.kind, t.text, t.start) for t in tokenize("12.5*sin(x)")] == [
+        ("number", "12.5", 0), ("op", "*", 4), ("name", "sin", 5), ("op", "(", 8), ("name", "x", 9), ("op", ")", 10),
+    ]
+
+def test_unchanged_groups_are_reused():
+    parser = FormulaParser({"sin"}, {"π"})
+    first = parser.parse("(1 + 2) * (3 + 4)")
+    second = parser.parse("(1 + 2) * (3 + 5)")
+    assert first.args[0] is second.args[0]
+    assert first.args[1] is not second.args[1]
+
+def test_results_are_recorded_as_formulas(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    logic = CalculatorLogic(history_path=path)
+    logic.formula_input("2 * (3 + 4)")
+    assert logic.evaluate_formula() == "14.0"
+    assert logic.get_history() == "2 * (3 + 4) = 14.0"
+    record, = HistoryStore(path=path)
+    assert (record.previous, record.operation, record.result) == ("2 * (3 + 4)", FORMULA, 14.0)
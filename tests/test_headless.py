@@ -0,0 +1,29 @@
+import io
+from headless import run
+
+def run_text(text, **options):
+    out = io.StringIO()
+    rows, _ = run(io.StringIO(text), out, **options)
+    return rows, out.getvalue().splitlines()
+
+def test_plain_lines():
+    rows, lines = run_text("1 + 2\n\nsqrt(-1)\n")
+    assert rows == 2
+    assert lines[0] == "expression,result,error"
+    assert lines[1] == "1 + 2,3,"
+    assert lines[2].startswith("sqrt(-1),,")
+
+def test_bad_csv_cells_are_reported_per_row():
+    rows, lines = run_text("expression,x,y\nx+y,1,2\nx+1,abc,3\nx*2,4\nx-y,5,1\n", use_csv=True)
+    assert rows == 4
+    assert lines[1:] == [
+        "x+y,1.0,2.0,3.0,",
+        "x+1,abc,3.0,,value 'abc' for 'x' is not a number",
+        "x*2,4.0,,,missing value for 'y'",
+        "x-y,5.0,1.0,4.0,",
+    ]
+
+def test_huge_integer_constants():
+    rows, lines = run_text("10**400\n-(10**200 * 10**200)\n")
+    assert lines[1] == "10**400,inf,"
+    assert lines[2] == "-(10**200 * 10**200),-1" + "0" * 400 + ","
@@ -0,0 +1,65 @@
+import json
+import os
+from decimal import Decimal
+from fractions import Fraction
+from history import HistoryStore
+
+def test_records_persist_and_reload(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    store = HistoryStore(path=path)
+    store.add(1.5, "+", 2, 3.5)
+    store.add(2j, "^", 2, -4 + 0j)
+    records = list(HistoryStore(path=path))
+    assert [(r.previous, r.operation, r.current, r.result) for r in records] == [(1.5, "+", 2, 3.5), (2j, "^", 2, -4 + 0j)]
+
+def test_exact_numbers_round_trip(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    store = HistoryStore(path=path)
+    store.add(Decimal("0.1"), "+", Decimal("0.2"), Decimal("0.3"))
+    store.add(Fraction(1, 3), "*", 3, Fraction(1))
+    records = list(HistoryStore(path=path))
+    assert [(r.previous, r.current, r.result) for r in records] == [
+        (Decimal("0.1"), Decimal("0.2"), Decimal("0.3")),
+        (Fraction(1, 3), 3, Fraction(1)),
+    ]
+
+def test_undecodable_numbers_are_skipped(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text('[1, "abc", "+", 1, 2]\n[1, "1", "+", "2", "3"]\n')
+    assert [r.result for r in HistoryStore(path=str(path))] == [Decimal(3)]
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text('not json\n[1, 1, "+"]\n[1, 1, "+", 2, 3]\n')
+    assert [r.result for r in HistoryStore(path=str(path))] == [3]
+
+def test_unreadable_files_load_empty(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_bytes(b'[1, 1, "+", 1, 2]\n[1, "\xff\xfe", "+", 1, 2]\n\xff\xfe\n')
+    assert [r.result for r in HistoryStore(path=str(path))] == [2]
+    assert len(HistoryStore(path=str(tmp_path))) == 0
+
+def test_load_keeps_the_newest_and_compacts(tmp_path):
+    path = tmp_path / "history.jsonl"
+    path.write_text("".join(json.dumps([i, i, "+", 1, i + 1]) + "\n" for i in range(50)))
+    store = HistoryStore(maxlen=10, path=str(path))
+    assert [r.previous for r in store] == list(range(40, 50))
+    assert len(path.read_text().splitlines()) == 10
+
+def test_failed_compaction_still_loads(tmp_path, monkeypatch):
+    path = tmp_path / "history.jsonl"
+    path.write_text("".join(json.dumps([i, i, "+", 1, i + 1]) + "\n" for i in range(50)))
+    def refuse(*args):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(os, "replace", refuse)
+    assert len(HistoryStore(maxlen=10, path=str(path))) == 10
+
+def test_last_and_pages():
+    store = HistoryStore(maxlen=100)
+    for i in range(25):
+        store.add(i, "+", 0, i)
+    assert [r.previous for r in store.last(3)] == [22, 23, 24]
+    assert [r.previous for r in store.last(3, skip=2)] == [20, 21, 22]
+    assert [r.previous for r in store.last(3, skip=24)] == [0]
+    assert [r.previous for r in store.page(1, 10)] == list(range(5, 15))
+    assert store.page_count(10) == 3
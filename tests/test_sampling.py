@@ -0,0 +1,21 @@
+import numpy as np
+from sampling import adaptive_sample
+
+def column_envelope(x, y, edges):
+    column = np.clip(np.searchsorted(edges, x, "right") - 1, 0, len(edges) - 2)
+    low, high = np.full(len(edges) - 1, np.inf), np.full(len(edges) - 1, -np.inf)
+    np.minimum.at(low, column, y)
+    np.maximum.at(high, column, y)
+    return low, high
+
+def test_adaptive_sampling_draws_the_dense_envelope():
+    func = lambda x: np.sin(3 * x * x)
+    x, y = adaptive_sample(func, -10, 10, 500, 400)
+    assert len(x) < 20000
+    edges = np.linspace(-10, 10, 501)
+    dense = np.linspace(-10, 10, 100000)
+    low, high = column_envelope(dense, func(dense), edges)
+    drawn_low, drawn_high = column_envelope(dense, np.interp(dense, x, y), edges)
+    ## One pixel of height is 2 / 400 here; allow two
+    assert np.abs(drawn_low - low).max() < 0.01
+    assert np.abs(drawn_high - high).max() < 0.01
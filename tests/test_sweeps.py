@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from sweeps import parse_sweep
+
+@pytest.mark.parametrize("text, values", [
+    ("k = 1:5", [1, 2, 3, 4, 5]),
+    ("k = 0:1:0.25", [0, 0.25, 0.5, 0.75, 1]),
+    ("a = 1, 2, 5", [1, 2, 5]),
+])
+def test_parse_sweep(text, values):
+    name, parsed = parse_sweep(text)
+    assert name == text[0]
+    assert np.allclose(parsed, values)
+
+@pytest.mark.parametrize("text", [
+    "k = 1:inf", "k = nan:5", "k = 0:1:inf", "k = 1, inf", "k = 0:1e308:1e-308",
+    "sin = 1:5", "pi = 1:5", "e = 1, 2", "x = 1:5", "k = 5:1", "k = 1:2:0",
+])
+def test_invalid_sweeps_raise_value_error(text):
+    with pytest.raises(ValueError):
+        parse_sweep(text)
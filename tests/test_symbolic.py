@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from calculator import CalculatorLogic
+from expressions import compile_expression
+
+def central_difference(func, x_values):
+    step = 1e-3 * np.maximum(1.0, np.abs(x_values))
+    return (func(x_values - 2 * step) - 8 * func(x_values - step) + 8 * func(x_values + step) - func(x_values + 2 * step)) / (12 * step)
+
+@pytest.mark.parametrize("source", [
+    "x**3 - 2*x",
+    "sin(x) * cos(2*x)",
+    "exp(-x**2 / 2)",
+    "ln(x**2 + 1)",
+    "sqrt(x**2 + 4) / (x + 5)",
+    "tan(x / 3)",
+    "log(x + 6)",
+    "x**x",
+])
+def test_derivative_matches_finite_differences(source):
+    expr = compile_expression(source)
+    x_values = np.linspace(0.3, 2.7, 25)
+    exact = expr.derivative().array({"x": x_values})
+    estimate = central_difference(lambda x: expr.array({"x": x}), x_values)
+    assert np.allclose(exact, estimate, rtol=1e-7, atol=1e-9)
+
+def test_with_derivative_returns_value_and_slope():
+    value, slope = compile_expression("x**2").with_derivative().scalar({"x": 3.0})
+    assert (value, slope) == (9.0, 6.0)
+
+def test_identities_are_simplified():
+    assert compile_expression("x * 1 + 0 * 0").text == "x + 0"
+    assert compile_expression("- -x").text == "x"
+
+def test_common_subexpressions_are_shared():
+    expr = compile_expression("sin(x) + sin(x) * sin(x)")
+    left, right = expr.outputs[0].args
+    assert left in right.args or right in left.args
+
+def test_variable_names_do_not_collide_with_generated_names():
+    logic = CalculatorLogic()
+    assert logic.evaluate_expression("_t0 + sin(x)*sin(x)", {"x": 1, "_t0": 5}) == pytest.approx(5 + np.sin(1) ** 2)
+    assert logic.evaluate_expression("_env + _v1 * x", {"x": 2, "_env": 1, "_v1": 3}) == 7
+
+def test_variables_cannot_shadow_built_in_names():
+    with pytest.raises(ValueError, match="shadows"):
+        CalculatorLogic().evaluate_expression("sin(x) + sin", {"sin": 2, "x": 1})
+    with pytest.raises(ValueError, match="shadows"):
+        compile_expression("pi * x", ("x", "pi"))
@@ -0,0 +1,42 @@
+from fractions import Fraction
+import numpy as np
+import pytest
+from units import UnitRegistry
+
+@pytest.fixture(scope="module")
+def units():
+    return UnitRegistry()
+
+@pytest.mark.parametrize("from_unit, to_unit, value, expected", [
+    ("km", "m", 1.5, 1500),
+    ("mi", "km", 1, 1.609344),
+    ("degC", "degF", 100, 212),
+    ("degF", "K", 32, 273.15),
+    ("h", "s", 2, 7200),
+    ("GiB", "MB", 1, 1073.741824),
+    ("turn", "rad", 1, 2 * np.pi),
+])
+def test_conversions(units, from_unit, to_unit, value, expected):
+    assert units.convert(value, from_unit, to_unit) == pytest.approx(expected)
+
+@pytest.mark.parametrize("from_unit, to_unit", [("ft", "nm"), ("degF", "degR"), ("psi", "torr"), ("kWh", "BTU")])
+def test_round_trips_are_exact(units, from_unit, to_unit):
+    scale, offset = units.exact_factors(from_unit, to_unit)
+    back_scale, back_offset = units.exact_factors(to_unit, from_unit)
+    assert scale * back_scale == 1
+    assert offset * back_scale + back_offset == 0
+
+def test_array_conversion_matches_scalar(units):
+    values = np.array([-40.0, 0.0, 37.0])
+    assert np.allclose(units.convert_array(values, "degC", "degF"), [units.convert(v, "degC", "degF") for v in values])
+
+def test_errors(units):
+    with pytest.raises(ValueError, match="Cannot convert"):
+        units.convert(1, "m", "kg")
+    with pytest.raises(ValueError, match="Unknown unit"):
+        units.convert(1, "m", "furlong")
+
+def test_added_units_chain_to_their_reference():
+    units = UnitRegistry()
+    units.add_unit("furlong", "ft", 660)
+    assert units.exact_factors("furlong", "m") == (Fraction(201168, 1000), 0)
@@ -0,0 +1,110 @@
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+from expressions import normalize_expression
+
+class TileCache:
+    """LRU cache of evaluated sample tiles, bounded by a memory budget.
+
+    The x axis is cut into tiles of width 2**level, each holding
+    tile_samples evenly spaced samples, so a tile is identified by
+    (expression, level, index) and covers [index * width, (index + 1) * width).
+    Panning only misses the tiles of the newly exposed strip, and zooming in
+    can show slices of coarser cached tiles until the finer ones are filled.
+    """
+
+    def __init__(self, evaluate, budget_bytes=32 * 1024 * 1024, tile_samples=256, oversample=2, max_coarser_levels=8):
+        self.evaluate = evaluate
+        self.budget_bytes = budget_bytes
+        self.tile_samples = tile_samples
+        self.oversample = oversample
+        self.max_coarser_levels = max_coarser_levels
+        self.used_bytes = 0
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def level_for(self, x_min, x_max, pixels):
+        """Returns the finest level that gives at least oversample samples per pixel column."""
+        spacing = (x_max - x_min) / (max(pixels, 1) * self.oversample)
+        return math.floor(math.log2(spacing * self.tile_samples))
+
+    def tile_x(self, level, index):
+        """Returns the x values sampled by a tile."""
+        width = 2.0 ** level
+        return (index + np.arange(self.tile_samples) / self.tile_samples) * width
+
+    def get(self, key):
+        """Returns the cached y values of a tile, or None."""
+        with self._lock:
+            y = self._tiles.get(key)
+            if y is not None:
+                self._tiles.move_to_end(key)
+            return y
+
+    def put(self, key, y):
+        """Stores a tile, evicting the least recently used ones beyond the budget."""
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old.nbytes
+            self._tiles[key] = y
+            self.used_bytes += y.nbytes
+            while self.used_bytes > self.budget_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self.used_bytes -= evicted.nbytes
+
+    def fill(self, key):
+        """Evaluates and stores a missing tile; safe to call from a worker thread."""
+        expr, level, index = key
+        self.put(key, self.evaluate(expr, self.tile_x(level, index)))
+
+    def lookup(self, func_str, x_min, x_max, pixels):
+        """Assembles samples covering [x_min, x_max] for a canvas pixels wide.
+
+        Returns (x, y, missing) where missing lists the keys of tiles that
+        still need filling; their interval is covered by a slice of a coarser
+        cached tile when one exists, and left empty otherwise.
+        """
+        expr = normalize_expression(func_str)
+        level = self.level_for(x_min, x_max, pixels)
+        width = 2.0 ** level
+        x_parts, y_parts, missing = [], [], []
+        for index in range(math.floor(x_min / width), math.floor(x_max / width) + 1):
+            key = (expr, level, index)
+            y = self.get(key)
+            if y is not None:
+                x_parts.append(self.tile_x(level, index))
+                y_parts.append(y)
+                continue
+            missing.append(key)
+            coarse = self.coarser(expr, level, index)
+            if coarse is not None:
+                x_parts.append(coarse[0])
+                y_parts.append(coarse[1])
+        if not x_parts:
+            return np.empty(0), np.empty(0), missing
+        return np.concatenate(x_parts), np.concatenate(y_parts), missing
+
+    def coarser(self, expr, level, index):
+        """Returns the part of the nearest cached coarser tile that covers a tile, or None."""
+        start = index * 2.0 ** level
+        stop = start + 2.0 ** level
+        for up in range(1, self.max_coarser_levels + 1):
+            coarse_level = level + up
+            coarse_index = math.floor(start / 2.0 ** coarse_level)
+            y = self.get((expr, coarse_level, coarse_index))
+            if y is not None:
+                x = self.tile_x(coarse_level, coarse_index)
+                mask = (x >= start) & (x < stop)
+                return x[mask], y[mask]
+        return None
+
+    def clear(self):
+        """Drops every cached tile."""
+        with self._lock:
+            self._tiles.clear()
+            self.used_bytes = 0
+
+    def __len__(self):
+        return len(self._tiles)
@@ -0,0 +1,158 @@
+from fractions import Fraction
+
+##Each unit is defined by an edge to a reference unit: 1 unit = factor * reference + offset.
+##Units with no reference are the base unit of their dimension.
+BASE_UNITS = {
+    "m": "length",
+    "kg": "mass",
+    "s": "time",
+    "K": "temperature",
+    "m2": "area",
+    "m3": "volume",
+    "m/s": "speed",
+    "m/s2": "acceleration",
+    "N": "force",
+    "Pa": "pressure",
+    "J": "energy",
+    "W": "power",
+    "rad": "angle",
+    "B": "data",
+    "Hz": "frequency",
+}
+UNIT_CATALOG = [
+    ## Length
+    ("km", "m", "1000"), ("cm", "m", "0.01"), ("mm", "m", "0.001"), ("um", "m", "1e-6"), ("nm", "m", "1e-9"),
+    ("in", "cm", "2.54"), ("ft", "in", "12"), ("yd", "ft", "3"), ("mi", "ft", "5280"), ("nmi", "m", "1852"),
+    ("au", "m", "149597870700"), ("ly", "m", "9460730472580800"), ("pc", "au", "206264.806247096"),
+    ## Mass
+    ("g", "kg", "0.001"), ("mg", "g", "0.001"), ("ug", "mg", "0.001"), ("t", "kg", "1000"),
+    ("lb", "kg", "0.45359237"), ("oz", "lb", "1/16"), ("st", "lb", "14"), ("ton_us", "lb", "2000"),
+    ## Time
+    ("ms", "s", "0.001"), ("us", "ms", "0.001"), ("ns", "us", "0.001"), ("min", "s", "60"),
+    ("h", "min", "60"), ("day", "h", "24"), ("week", "day", "7"), ("yr", "day", "365.25"),
+    ## Temperature (affine)
+    ("degC", "K", "1", "273.15"), ("degF", "degC", "5/9", "-160/9"), ("degR", "K", "5/9"),
+    ## Area
+    ("km2", "m2", "1000000"), ("cm2", "m2", "0.0001"), ("mm2", "m2", "0.000001"), ("ha", "m2", "10000"),
+    ("in2", "cm2", "6.4516"), ("ft2", "in2", "144"), ("yd2", "ft2", "9"), ("acre", "ft2", "43560"), ("mi2", "acre", "640"),
+    ## Volume
+    ("L", "m3", "0.001"), ("mL", "L", "0.001"), ("cm3", "mL", "1"), ("in3", "cm3", "16.387064"), ("ft3", "in3", "1728"),
+    ("gal", "in3", "231"), ("qt", "gal", "1/4"), ("pt", "qt", "1/2"), ("cup", "pt", "1/2"), ("floz", "cup", "1/8"),
+    ("gal_uk", "L", "4.54609"),
+    ## Speed and acceleration
+    ("km/h", "m/s", "1000/3600"), ("mph", "m/s", "0.44704"), ("kn", "m/s", "1852/3600"), ("ft/s", "m/s", "0.3048"),
+    ("g0", "m/s2", "9.80665"), ("ft/s2", "m/s2", "0.3048"),
+    ## Force
+    ("kN", "N", "1000"), ("dyn", "N", "1e-5"), ("kgf", "N", "9.80665"), ("lbf", "N", "4.4482216152605"),
+    ## Pressure
+    ("kPa", "Pa", "1000"), ("MPa", "kPa", "1000"), ("bar", "Pa", "100000"), ("mbar", "bar", "0.001"),
+    ("atm", "Pa", "101325"), ("torr", "atm", "1/760"), ("mmHg", "Pa", "133.322387415"), ("psi", "Pa", "6894.757293168"),
+    ## Energy
+    ("kJ", "J", "1000"), ("MJ", "kJ", "1000"), ("cal", "J", "4.184"), ("kcal", "cal", "1000"),
+    ("Wh", "J", "3600"), ("kWh", "Wh", "1000"), ("eV", "J", "1.602176634e-19"), ("BTU", "J", "1055.05585262"),
+    ## Power
+    ("kW", "W", "1000"), ("MW", "kW", "1000"), ("hp", "W", "745.69987158227022"),
+    ## Angle
+    ("deg", "rad", "3.14159265358979323846264338327950288/180"), ("grad", "deg", "0.9"), ("turn", "deg", "360"),
+    ("arcmin", "deg", "1/60"), ("arcsec", "arcmin", "1/60"),
+    ## Data
+    ("bit", "B", "1/8"), ("kB", "B", "1000"), ("MB", "kB", "1000"), ("GB", "MB", "1000"), ("TB", "GB", "1000"),
+    ("KiB", "B", "1024"), ("MiB", "KiB", "1024"), ("GiB", "MiB", "1024"), ("TiB", "GiB", "1024"),
+    ## Frequency
+    ("kHz", "Hz", "1000"), ("MHz", "kHz", "1000"), ("GHz", "MHz", "1000"), ("rpm", "Hz", "1/60"),
+]
+
+def _fraction(text):
+    """Parses a catalog number, allowing a/b with decimal parts."""
+    numerator, _, denominator = text.partition("/")
+    return Fraction(numerator) / Fraction(denominator or 1)
+
+class UnitRegistry:
+    """Graph of units where each unit points to a reference unit of the same dimension.
+
+    Resolving a unit walks its edges to the dimension's base unit and
+    composes the affine maps exactly with Fractions. The composite
+    (scale, offset) for each (from, to) pair is computed once and cached, so
+    a conversion is a single multiply-add.
+    """
+
+    def __init__(self, base_units=BASE_UNITS, catalog=UNIT_CATALOG):
+        self.dimensions = {}
+        self.edges = {}
+        self._resolved = {}
+        self._exact = {}
+        self._float = {}
+        for name, dimension in base_units.items():
+            self.add_base(name, dimension)
+        for entry in catalog:
+            self.add_unit(entry[0], entry[1], *(_fraction(number) for number in entry[2:]))
+
+    def add_base(self, name, dimension):
+        """Adds the base unit of a dimension."""
+        self.dimensions[name] = dimension
+
+    def add_unit(self, name, reference, factor, offset=0):
+        """Adds a unit equal to factor * reference + offset."""
+        if reference not in self.dimensions:
+            raise ValueError(f"Unknown unit: {reference}")
+        self.dimensions[name] = self.dimensions[reference]
+        self.edges[name] = (reference, Fraction(factor), Fraction(offset))
+        self._exact.clear()
+        self._float.clear()
+
+    def resolve(self, name):
+        """Returns (scale, offset) mapping a value in unit name to the base unit of its dimension."""
+        if name not in self._resolved:
+            if name not in self.dimensions:
+                raise ValueError(f"Unknown unit: {name}")
+            scale, offset = Fraction(1), Fraction(0)
+            unit = name
+            while unit in self.edges:
+                unit, factor, shift = self.edges[unit]
+                scale, offset = scale * factor, offset * factor + shift
+            self._resolved[name] = (scale, offset)
+        return self._resolved[name]
+
+    def exact_factors(self, from_unit, to_unit):
+        """Returns the exact (scale, offset) Fractions converting from_unit to to_unit."""
+        key = (from_unit, to_unit)
+        if key not in self._exact:
+            if self.dimension(from_unit) != self.dimension(to_unit):
+                raise ValueError(f"Cannot convert {self.dimension(from_unit)} to {self.dimension(to_unit)}")
+            from_scale, from_offset = self.resolve(from_unit)
+            to_scale, to_offset = self.resolve(to_unit)
+            self._exact[key] = (from_scale / to_scale, (from_offset - to_offset) / to_scale)
+        return self._exact[key]
+
+    def factors(self, from_unit, to_unit):
+        """Returns the float (scale, offset) converting from_unit to to_unit."""
+        key = (from_unit, to_unit)
+        factors = self._float.get(key)
+        if factors is None:
+            scale, offset = self.exact_factors(from_unit, to_unit)
+            factors = self._float[key] = (float(scale), float(offset))
+        return factors
+
+    def convert(self, value, from_unit, to_unit):
+        """Converts a float from from_unit to to_unit."""
+        scale, offset = self.factors(from_unit, to_unit)
+        return value * scale + offset
+
+    def convert_array(self, values, from_unit, to_unit):
+        """Converts a whole array of values in one vectorized multiply-add."""
+        import numpy as np
+        scale, offset = self.factors(from_unit, to_unit)
+        result = np.asarray(values, dtype=np.float64) * scale
+        if offset:
+            result += offset
+        return result
+
+    def dimension(self, name):
+        """Returns the dimension of a unit."""
+        if name not in self.dimensions:
+            raise ValueError(f"Unknown unit: {name}")
+        return self.dimensions[name]
+
+    def units(self, dimension=None):
+        """Returns the unit names, optionally only those of one dimension."""
+        return [name for name, dim in self.dimensions.items() if dimension is None or dim == dimension]